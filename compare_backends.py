@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Compare Pillow and FFmpeg-native slide rendering for a quote from the database."""
+
+import os
+import sys
+
+from src.generators.video_generator import VideoGenerator
+from src.utils.database import QuoteDatabase
+
+def main():
+    tolerance = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    
+    # Same database as the app; the claim keeps the app from using the quote
+    # meanwhile and is released afterwards, so no quote status changes
+    db = QuoteDatabase(os.environ.get("QUOTES_DB_PATH", "data/quotes/quotes.db"))
+    quote = db.claim_random_unused_quote()
+    if quote is None:
+        print("❌ No unused quotes in database. Upload a CSV first.")
+        return 1
+    
+    try:
+        print(f"Quote: {quote.quote[:50]}...")
+        print(f"Tolerance (mean abs diff): {tolerance}\n")
+        
+        results = VideoGenerator().compare_backends(quote, tolerance=tolerance)
+    finally:
+        db.release_quote(quote.id)
+    
+    all_passed = True
+    for slide, diff in results.items():
+        status = "✅" if diff['passed'] else "❌"
+        print(f"{status} {slide}: mean diff {diff['mean_diff']:.3f}, max diff {diff['max_diff']}")
+        all_passed &= diff['passed']
+    
+    return 0 if all_passed else 1
+
+if __name__ == "__main__":
+    exit(main())
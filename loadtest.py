@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Drive a local app instance with concurrent simulated users and report latency and resource use.
+
+Starts main.py on a free port against a synthetic quote database in a
+temporary working directory (nothing leaves the machine and the checkout
+stays clean), runs a scenario and prints p50/p95/p99 latency,
+throughput, error and rejection rates, and CPU/memory of the server
+process tree.
+
+    python loadtest.py --scenario import-burst --clients 4 --requests 3
+"""
+
+import os
+import csv
+import sys
+import json
+import math
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+import httpx
+from gradio_client import Client
+
+try:
+    from gradio_client import handle_file
+except ImportError:
+    # Older clients take plain file paths
+    def handle_file(path):
+        return path
+
+from src.utils.database import QuoteDatabase
+
+REPO_DIR = Path(__file__).resolve().parent
+
+# Relative frequency of each action in the "mixed" scenario
+MIX = {"generate": 1, "stats": 6, "upload": 1}
+
+def build_plans(scenario: str, clients: int, requests: int, rng: random.Random) -> list:
+    """Return one list of actions per simulated client."""
+    if scenario == "generate":
+        return [["generate"] * requests for _ in range(clients)]
+    if scenario == "mixed":
+        actions, weights = zip(*MIX.items())
+        return [rng.choices(actions, weights, k=requests) for _ in range(clients)]
+    if scenario == "import-burst":
+        # One client keeps importing CSVs while the others all generate at once
+        return [["upload"] * requests] + [["generate"] * requests for _ in range(clients)]
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+def write_synthetic_csv(path: Path, count: int, rng: random.Random):
+    """Write `count` quotes in the upload CSV format."""
+    words = ["cisza", "oddech", "spokój", "uważność", "chwila", "światło", "droga", "serce", "umysł", "ciało"]
+
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["ID", "QUOTE", "AUTHOR", "REFLECTION", "SOCIAL_MEDIA_POST", "STATUS"])
+        for index in range(1, count + 1):
+            quote = " ".join(rng.choices(words, k=rng.randint(6, 20))).capitalize() + "."
+            reflection = " ".join(rng.choices(words, k=rng.randint(8, 20))).capitalize() + "."
+            writer.writerow([index, quote, f"Autor {index}", reflection, f"{quote} #medytacja", "unused"])
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def prepare_workdir(work_dir: Path):
+    """Mirror the repo's assets into `work_dir` for the server to run in.
+
+    Directories are created and files symlinked, so the app finds its
+    backgrounds, fonts and music while everything it writes (app.log,
+    output/, data/assets.json, the font coverage cache) stays in `work_dir`.
+    """
+    source_root = REPO_DIR / "data"
+    for source in source_root.rglob("*"):
+        if source.is_relative_to(source_root / "quotes"):
+            continue
+        target = work_dir / "data" / source.relative_to(source_root)
+        if source.is_dir():
+            target.mkdir(parents=True, exist_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.symlink_to(source)
+
+def start_server(db_path: Path, port: int, work_dir: Path) -> subprocess.Popen:
+    """Launch main.py in `work_dir` in the background and wait until it answers."""
+    prepare_workdir(work_dir)
+    log_path = work_dir / "server.log"
+    env = dict(os.environ, QUOTES_DB_PATH=str(db_path), GRADIO_SERVER_PORT=str(port), GRADIO_ANALYTICS_ENABLED="False")
+    log = open(log_path, 'w')
+    process = subprocess.Popen([sys.executable, str(REPO_DIR / "main.py")], cwd=work_dir, env=env,
+                               stdout=log, stderr=subprocess.STDOUT)
+
+    url = f"http://127.0.0.1:{port}/"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise Exception(f"Server exited with code {process.returncode}, see {log_path}")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+
+    process.terminate()
+    raise Exception(f"Server did not start within 120s, see {log_path}")
+
+class ProcessMonitor:
+    """Sample CPU and resident memory of a process and its children from /proc."""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="monitor", daemon=True)
+        self._ticks = os.sysconf('SC_CLK_TCK')
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+
+        if not self.samples:
+            return {}
+        cpu = [sample['cpu_percent'] for sample in self.samples]
+        rss = [sample['rss_mb'] for sample in self.samples]
+        return {
+            'cpu_mean_percent': sum(cpu) / len(cpu),
+            'cpu_peak_percent': max(cpu),
+            'rss_mean_mb': sum(rss) / len(rss),
+            'rss_peak_mb': max(rss),
+        }
+
+    def _run(self):
+        last_cpu, last_time = self._read()[0], time.monotonic()
+        while not self._stop.wait(self.interval):
+            cpu, rss = self._read()
+            now = time.monotonic()
+            self.samples.append({
+                # Ticks of children vanish briefly between their exit and being reaped
+                'cpu_percent': max(0.0, 100.0 * (cpu - last_cpu) / self._ticks / (now - last_time)),
+                'rss_mb': rss * self._page_size / 1024 / 1024,
+            })
+            last_cpu, last_time = cpu, now
+
+    def _read(self):
+        """Return (CPU ticks, resident pages) summed over the process tree."""
+        stats = {}
+        for entry in Path("/proc").iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                # Fields after the command name, which may itself contain spaces
+                fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            stats[int(entry.name)] = fields
+
+        tree = {self.pid}
+        changed = True
+        while changed:
+            children = {pid for pid, fields in stats.items() if int(fields[1]) in tree} - tree
+            tree |= children
+            changed = bool(children)
+
+        # utime, stime, cutime, cstime and rss, counted from the state field
+        cpu = sum(sum(int(value) for value in stats[pid][11:15]) for pid in tree if pid in stats)
+        rss = sum(int(stats[pid][21]) for pid in tree if pid in stats)
+        return cpu, rss
+
+def run_client(url: str, actions: list, csv_path: Path, barrier: threading.Barrier, results: list, lock: threading.Lock):
+    """Run one simulated user's actions back to back, recording each call."""
+    try:
+        client = Client(url, verbose=False)
+    except Exception:
+        # Release the other clients instead of leaving them waiting forever
+        barrier.abort()
+        raise
+    barrier.wait()
+
+    for action in actions:
+        start = time.perf_counter()
+        try:
+            if action == "generate":
+                status = client.predict(api_name="/generate_video")[1]
+            elif action == "upload":
+                status = client.predict(handle_file(str(csv_path)), api_name="/upload_csv")
+            else:
+                status = client.predict(api_name="/get_database_stats")
+
+            if status.startswith("⚠️"):
+                outcome = "rejected"
+            elif status.startswith("❌"):
+                outcome = "error"
+            else:
+                outcome = "ok"
+        except Exception as e:
+            status, outcome = str(e), "error"
+
+        with lock:
+            results.append({
+                'action': action,
+                'outcome': outcome,
+                'latency': time.perf_counter() - start,
+                'status': status[:120]
+            })
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(results: list, duration: float) -> dict:
+    summary = {}
+    for action in sorted({result['action'] for result in results}):
+        calls = [result for result in results if result['action'] == action]
+        latencies = [result['latency'] for result in calls]
+        ok = sum(result['outcome'] == "ok" for result in calls)
+        summary[action] = {
+            'calls': len(calls),
+            'ok': ok,
+            'error_rate': sum(result['outcome'] == "error" for result in calls) / len(calls),
+            'rejection_rate': sum(result['outcome'] == "rejected" for result in calls) / len(calls),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'throughput_per_min': 60 * ok / duration,
+        }
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scenario", choices=["generate", "mixed", "import-burst"], default="generate")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=3, help="requests per user")
+    parser.add_argument("--quotes", type=int, default=200, help="quotes in the synthetic database")
+    parser.add_argument("--url", help="test a running instance instead of starting one (no resource stats)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    plans = build_plans(args.scenario, args.clients, args.requests, rng)
+
+    with tempfile.TemporaryDirectory(prefix="loadtest_") as temp_dir:
+        temp_path = Path(temp_dir)
+        csv_path = temp_path / "quotes.csv"
+        write_synthetic_csv(csv_path, args.quotes, rng)
+
+        server = None
+        monitor = None
+        url = args.url
+        if url is None:
+            db_path = temp_path / "quotes.db"
+            QuoteDatabase(str(db_path)).upload_csv(str(csv_path))
+            port = free_port()
+            print(f"Starting server on port {port} with {args.quotes} synthetic quotes...")
+            server = start_server(db_path, port, temp_path / "server")
+            url = f"http://127.0.0.1:{port}/"
+            monitor = ProcessMonitor(server.pid)
+
+        results = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(plans) + 1)
+        threads = [
+            threading.Thread(target=run_client, args=(url, actions, csv_path, barrier, results, lock), name=f"client-{number}")
+            for number, actions in enumerate(plans)
+        ]
+
+        try:
+            for thread in threads:
+                thread.start()
+            # Clients connect first, then all start together
+            barrier.wait()
+            if monitor:
+                monitor.start()
+            start = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            duration = time.perf_counter() - start
+            resources = monitor.stop() if monitor else {}
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+
+    report = {
+        'scenario': args.scenario,
+        'clients': len(plans),
+        'duration_s': duration,
+        'requests_per_s': len(results) / duration,
+        'actions': summarize(results, duration),
+        'resources': resources,
+    }
+
+    print(f"\nScenario '{args.scenario}': {len(results)} requests from {len(plans)} clients in {duration:.1f}s ({report['requests_per_s']:.2f} req/s)\n")
+    for action, stats in report['actions'].items():
+        print(
+            f"{action:>9}: {stats['calls']} calls, p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, p99 {stats['p99']:.2f}s, "
+            f"{stats['throughput_per_min']:.1f} ok/min, errors {stats['error_rate']:.0%}, rejected {stats['rejection_rate']:.0%}"
+        )
+    if resources:
+        print(
+            f"\nServer CPU: mean {resources['cpu_mean_percent']:.0f}%, peak {resources['cpu_peak_percent']:.0f}%  "
+            f"RSS: mean {resources['rss_mean_mb']:.0f} MB, peak {resources['rss_peak_mb']:.0f} MB"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+
+    return 1 if any(stats['error_rate'] > 0 for stats in report['actions'].values()) else 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -2,23 +2,54 @@ import gradio as gr
 import os
 import threading
 import logging
+import uvicorn
+from typing import Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from src.generators.video_generator import VideoGenerator
+from src.models import GeneratedVideo
 from src.utils.database import QuoteDatabase
+from src.utils.logging_setup import job_context, new_job_id, setup_logging
+from src.utils.assets import get_manifest
+from src.utils.export import stream_export
+from src.utils.scheduler import BatchScheduler, in_windows, parse_windows
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler()
-    ]
+# Configure logging: queued, rotated JSON file log plus console output
+setup_logging(
+    'app.log',
+    debug_sample_rate=float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "0"))
 )
 logger = logging.getLogger(__name__)
 
+# Slide render backend: "pillow" (default) or "ffmpeg"
+RENDER_BACKEND = os.environ.get("RENDER_BACKEND", "pillow")
+
+# Quote slide text reveal: empty for a static slide, "word" or "fade"
+TEXT_ANIMATION = os.environ.get("TEXT_ANIMATION") or None
+
+# "faststart" (default) or "fragmented" MP4 output
+OUTPUT_MODE = os.environ.get("OUTPUT_MODE", "faststart")
+
+# Stream preview segments to the player while encoding (implies fragmented output)
+PROGRESSIVE_OUTPUT = os.environ.get("PROGRESSIVE_OUTPUT", "").lower() in ("1", "true", "yes")
+if PROGRESSIVE_OUTPUT and int(gr.__version__.split(".")[0]) < 5:
+    # Streaming segments into gr.Video needs Gradio 5
+    logger.warning(f"PROGRESSIVE_OUTPUT requires Gradio 5 or newer (installed: {gr.__version__}), disabling it")
+    PROGRESSIVE_OUTPUT = False
+
+# Quote database location (the load test points this at a synthetic database)
+QUOTES_DB_PATH = os.environ.get("QUOTES_DB_PATH", "data/quotes/quotes.db")
+
+# Batch generation of a daily quota (0 disables it) in off-peak windows, with
+# at most SCHEDULER_CPU_BUDGET threads (default: all cores)
+SCHEDULER_DAILY_QUOTA = int(os.environ.get("SCHEDULER_DAILY_QUOTA", "0"))
+SCHEDULER_WINDOWS = os.environ.get("SCHEDULER_WINDOWS", "01:00-06:00")
+SCHEDULER_CPU_BUDGET = int(os.environ.get("SCHEDULER_CPU_BUDGET", "0")) or None
+
 # Global state for generation
 is_generating = False
 generation_lock = threading.Lock()
+scheduler: Optional[BatchScheduler] = None
 
 def upload_csv(csv_file):
     """Upload CSV file with quotes."""
@@ -26,7 +57,7 @@ def upload_csv(csv_file):
         return "❌ Nie wybrano pliku CSV"
     
     try:
-        db = QuoteDatabase()
+        db = QuoteDatabase(QUOTES_DB_PATH)
         added_count = db.upload_csv(csv_file.name)
         stats = db.get_stats()
         
@@ -38,7 +69,7 @@ def upload_csv(csv_file):
 def get_database_stats():
     """Get current database statistics."""
     try:
-        db = QuoteDatabase()
+        db = QuoteDatabase(QUOTES_DB_PATH)
         stats = db.get_stats()
         return f"📊 Baza cytatów: {stats['total']} łącznie ({stats['unused']} nieużytych, {stats['used']} użytych)"
     except Exception as e:
@@ -46,6 +77,26 @@ def get_database_stats():
 
 def generate_video():
     """Generate video from random quote."""
+    # Every log line of this request, including render threads, carries one job id
+    with job_context():
+        *_, result = _generate_video()
+        return result
+
+def generate_video_progressive():
+    """Generate video from random quote, streaming preview segments while it encodes."""
+    # Gradio may advance the generator from different threads, so the job
+    # context is entered around each step instead of across yields
+    job_id = new_job_id()
+    steps = _generate_video(progressive=True)
+    while True:
+        with job_context(job_id):
+            step = next(steps, None)
+        if step is None:
+            return
+        yield step
+
+def _generate_video(progressive: bool = False):
+    """Yield UI updates for one generation; the last one carries the final result."""
     global is_generating
     
     logger.info("Video generation requested")
@@ -53,30 +104,59 @@ def generate_video():
     with generation_lock:
         if is_generating:
             logger.warning("Video generation already in progress")
-            return None, "⚠️ Trwa już generowanie wideo. Proszę poczekać...", "", "", ""
+            yield None, "⚠️ Trwa już generowanie wideo. Proszę poczekać...", "", "", ""
+            return
         
         is_generating = True
     
+    # Batch generation yields its CPU budget while this request runs
+    if scheduler:
+        scheduler.begin_interactive()
+    
+    quote = None
+    quote_used = False
     try:
-        # Get random quote
+        # Claim a random quote so a concurrent batch video cannot pick it too
         logger.info("Getting random quote from database")
-        db = QuoteDatabase()
-        quote = db.get_random_unused_quote()
+        db = QuoteDatabase(QUOTES_DB_PATH)
+        quote = db.claim_random_unused_quote(reset_when_empty=True)
         
         if quote is None:
             logger.warning("No quotes available in database")
-            return None, "❌ Brak cytatów w bazie. Proszę wgrać plik CSV z cytatami.", "", "", ""
+            yield None, "❌ Brak cytatów w bazie. Proszę wgrać plik CSV z cytatami.", "", "", ""
+            return
         
         logger.info(f"Selected quote: {quote.quote[:50]}... by {quote.author}")
         
         # Generate video
         logger.info("Starting video generation")
-        generator = VideoGenerator()
-        generated_video = generator.create_video(quote)
+        generator = VideoGenerator(
+            render_backend=RENDER_BACKEND,
+            animation=TEXT_ANIMATION,
+            output_mode="fragmented" if progressive else OUTPUT_MODE
+        )
+        
+        if progressive:
+            # Stream preview segments to the player as FFmpeg flushes them
+            generated_video = None
+            for item in generator.create_video_progressive(quote):
+                if isinstance(item, GeneratedVideo):
+                    generated_video = item
+                else:
+                    yield item, "⏳ Generowanie wideo...", "", gr.update(), ""
+        else:
+            generated_video = generator.create_video(quote)
         
         # Mark quote as used
         logger.info("Marking quote as used")
         db.mark_quote_used(quote.id)
+        quote_used = True
+        video_id = db.add_video(
+            quote.id,
+            generated_video.file_path,
+            generated_video.thumbnails,
+            generated_video.generation_time
+        )
         
         # Update stats
         stats = db.get_stats()
@@ -87,24 +167,90 @@ def generate_video():
         video_path = os.path.abspath(generated_video.file_path)
         logger.info(f"Returning video path: {video_path}")
         
-        return (
-            video_path,
+        yield (
+            # The streamed preview already holds the whole video
+            gr.update() if progressive else video_path,
             status_message,
             quote.social_media_post,
             get_database_stats(),
-            f"📁 Plik wideo: {video_path}"
+            f"📁 Plik wideo: {video_path} (ID: {video_id})"
         )
         
     except Exception as e:
         error_msg = f"❌ Błąd podczas generowania: {str(e)}"
         logger.error(f"Video generation failed: {str(e)}")
-        return None, error_msg, "", get_database_stats(), ""
+        yield None, error_msg, "", get_database_stats(), ""
     
     finally:
+        # Failed or abandoned generations give their quote back
+        if quote is not None and not quote_used:
+            db.release_quote(quote.id)
         with generation_lock:
             is_generating = False
+        if scheduler:
+            scheduler.end_interactive()
         logger.info("Video generation process completed")
 
+def generate_batch_video(threads: int) -> bool:
+    """Generate one scheduled video with at most `threads` threads; False when no quotes are left."""
+    db = QuoteDatabase(QUOTES_DB_PATH)
+    # Never recycles used quotes: the scheduler stops once the unused ones run out
+    quote = db.claim_random_unused_quote()
+    if quote is None:
+        return False
+    
+    generator = VideoGenerator(
+        render_workers=threads,
+        ffmpeg_threads=threads,
+        render_backend=RENDER_BACKEND,
+        animation=TEXT_ANIMATION,
+        output_mode=OUTPUT_MODE
+    )
+    try:
+        generated_video = generator.create_video(quote)
+    except Exception:
+        db.release_quote(quote.id)
+        raise
+    
+    db.mark_quote_used(quote.id)
+    db.add_video(quote.id, generated_video.file_path, generated_video.thumbnails, generated_video.generation_time)
+    return True
+
+def list_videos():
+    """List recently generated videos for the export tab."""
+    try:
+        videos = QuoteDatabase(QUOTES_DB_PATH).get_videos(limit=50)
+        if not videos:
+            return "Brak wygenerowanych filmów"
+        return "\n".join(
+            f"{video['id']}: {os.path.basename(video['file_path'])} ({video['created_at']})"
+            for video in videos
+        )
+    except Exception as e:
+        return f"❌ Błąd: {str(e)}"
+
+def export_link(ids_text):
+    """Build the download link for the selected video ids (all videos when empty)."""
+    ids = ",".join(part.strip() for part in (ids_text or "").split(",") if part.strip())
+    url = f"/export.zip?ids={ids}" if ids else "/export.zip"
+    return f"[📦 Pobierz ZIP]({url})"
+
+def export_videos(ids: Optional[str] = None):
+    """Stream a ZIP with the selected videos, their social media posts and a manifest."""
+    try:
+        video_ids = [int(part) for part in ids.split(",") if part.strip()] if ids else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    
+    videos = QuoteDatabase(QUOTES_DB_PATH).get_videos(video_ids)
+    logger.info(f"Exporting {len(videos)} videos")
+    
+    return StreamingResponse(
+        stream_export(videos),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="shorts-export.zip"'}
+    )
+
 def copy_social_media_text(text):
     """Return text for copying."""
     if text:
@@ -112,6 +258,29 @@ def copy_social_media_text(text):
     return gr.update(value="❌ Brak tekstu do skopiowania", visible=True)
 
 def main():
+    global scheduler
+    
+    # Validate assets once at startup instead of on every request
+    missing_assets = get_manifest().missing()
+    if missing_assets:
+        logger.warning(f"Missing required assets: {', '.join(missing_assets)}")
+    
+    # Claims of generations that were running when the app last stopped
+    released = QuoteDatabase(QUOTES_DB_PATH).release_claimed_quotes()
+    if released:
+        logger.info(f"Released {released} quote(s) claimed by unfinished generations")
+    
+    if SCHEDULER_DAILY_QUOTA > 0:
+        windows = parse_windows(SCHEDULER_WINDOWS)
+        scheduler = BatchScheduler(
+            generate_batch_video,
+            QuoteDatabase(QUOTES_DB_PATH),
+            SCHEDULER_DAILY_QUOTA,
+            is_off_peak=lambda now: in_windows(windows, now),
+            cpu_budget=SCHEDULER_CPU_BUDGET
+        )
+        scheduler.start()
+    
     # Custom CSS for dark theme
     css = """
     .gradio-container {
@@ -157,7 +326,9 @@ def main():
                             label="Wygenerowane wideo",
                             height=400,
                             show_download_button=True,
-                            show_share_button=False
+                            show_share_button=False,
+                            # Only Gradio 5 knows these, so leave them out unless streaming
+                            **({'streaming': True, 'autoplay': True} if PROGRESSIVE_OUTPUT else {})
                         )
                         
                         download_info = gr.Textbox(
@@ -185,8 +356,9 @@ def main():
                 
                 # Event handlers
                 generate_btn.click(
-                    fn=generate_video,
-                    outputs=[video_output, generation_status, social_media_text, db_stats, download_info]
+                    fn=generate_video_progressive if PROGRESSIVE_OUTPUT else generate_video,
+                    outputs=[video_output, generation_status, social_media_text, db_stats, download_info],
+                    api_name="generate_video"
                 )
                 
                 copy_btn.click(
@@ -203,7 +375,8 @@ def main():
                 # Auto-refresh stats when page loads
                 app.load(
                     fn=get_database_stats,
-                    outputs=[db_stats]
+                    outputs=[db_stats],
+                    api_name="get_database_stats"
                 )
             
             # Tab 2: Upload CSV
@@ -230,18 +403,45 @@ def main():
                 upload_btn.click(
                     fn=upload_csv,
                     inputs=[csv_file],
-                    outputs=[upload_status]
+                    outputs=[upload_status],
+                    api_name="upload_csv"
                 )
         
+            # Tab 3: Export videos with social media posts
+            with gr.TabItem("📦 Eksport"):
+                gr.Markdown("### Pobierz filmy wraz z tekstami do social media")
+                
+                with gr.Row():
+                    with gr.Column():
+                        video_list = gr.Textbox(
+                            label="Wygenerowane filmy (ID: plik)",
+                            interactive=False,
+                            lines=10
+                        )
+                        refresh_btn = gr.Button("🔄 Odśwież listę", variant="secondary")
+                    
+                    with gr.Column():
+                        export_ids = gr.Textbox(
+                            label="ID filmów do eksportu",
+                            placeholder="np. 1,2,3 (puste = wszystkie)"
+                        )
+                        export_btn = gr.Button("📦 Przygotuj eksport", variant="primary")
+                        export_download = gr.Markdown()
+                
+                refresh_btn.click(fn=list_videos, outputs=[video_list])
+                export_btn.click(fn=export_link, inputs=[export_ids], outputs=[export_download])
+                app.load(fn=list_videos, outputs=[video_list])
+        
         gr.Markdown("---")
         gr.Markdown("*ShortsGenerator MVP - Profesjonalne wideo w 1-3 minuty*")
     
-    app.launch(
-        server_name="0.0.0.0",
-        server_port=7860,
-        share=False,
-        show_error=True
-    )
+    # Serve the UI next to a plain HTTP route, so exports stream straight to the response
+    server = FastAPI()
+    server.add_api_route("/export.zip", export_videos, methods=["GET"])
+    # Show handler errors in the UI, as launch(show_error=True) did before the mount
+    server = gr.mount_gradio_app(server, app, path="/", show_error=True)
+    
+    uvicorn.run(server, host="0.0.0.0", port=int(os.environ.get("GRADIO_SERVER_PORT", "7860")))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import logging
+from pathlib import Path
+from typing import Optional
+import ffmpeg
+from PIL import Image, ImageChops, ImageColor
+
+from .overlay import Color, IconItem, Overlay, TextItem
+from .slide_renderer import SlideRenderer
+
+logger = logging.getLogger(__name__)
+
+
+class FFmpegSlideRenderer:
+    """Describes slides as FFmpeg drawtext/overlay filter chains.
+
+    Uses the layout computed by SlideRenderer, but leaves rasterization to
+    FFmpeg, so the whole video is produced by one process without writing
+    intermediate slide images.
+    """
+
+    def __init__(self, renderer: SlideRenderer, work_dir: Path, fps: int = 30):
+        self.renderer = renderer
+        self.fps = fps
+        # Text lines are passed through files to avoid filtergraph escaping issues
+        self.work_dir = work_dir
+        self._text_file_count = 0
+
+    def slide_stream(self, background_path: str, overlay: Optional[Overlay], duration: float):
+        """Build the filtered stream for one slide: background, overlay items and watermark."""
+        size = (self.renderer.width, self.renderer.height)
+
+        stream = ffmpeg.input(background_path, loop=1, t=duration, framerate=self.fps)
+        stream = stream.filter('scale', size[0], size[1], flags='lanczos')
+        stream = stream.filter('format', 'rgba')
+
+        items = list(overlay.items) if overlay else []
+        items += self.renderer.layout_watermark(size).items
+
+        for item in items:
+            if isinstance(item, TextItem):
+                stream = self._draw_text(stream, item)
+            elif isinstance(item, IconItem):
+                stream = self._overlay_icon(stream, item)
+
+        # xfade needs every slide in the same pixel format as the PNG-based path
+        return stream.filter('format', 'rgb24')
+
+    def render_frame(self, stream, frame_path: Path):
+        """Render the first frame of a slide stream to an image file."""
+        try:
+            ffmpeg.output(stream, str(frame_path), vframes=1).run(overwrite_output=True, quiet=True)
+        except ffmpeg.Error as e:
+            raise Exception(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
+
+    def _draw_text(self, stream, item: TextItem):
+        font_path = getattr(item.font, 'path', None)
+        if not isinstance(font_path, (str, Path)):
+            raise Exception("FFmpeg render backend requires a TrueType font file")
+
+        self._text_file_count += 1
+        text_file = self.work_dir / f"text_{self._text_file_count}.txt"
+        text_file.write_text(item.text, encoding='utf-8')
+
+        # Pillow places the ascender line at y; drawtext places the top of the
+        # tallest glyph at y, so shift by the difference to share the baseline.
+        ascent, _ = item.font.getmetrics()
+        x, y = item.xy
+
+        return stream.filter(
+            'drawtext',
+            textfile=str(text_file),
+            fontfile=str(font_path),
+            fontsize=item.font.size,
+            fontcolor=self._ffmpeg_color(item.fill),
+            x=x,
+            y=f"{y + ascent}-max_glyph_a",
+            expansion='none'
+        )
+
+    def _overlay_icon(self, stream, item: IconItem):
+        if not item.source:
+            raise Exception("FFmpeg render backend requires icon source files")
+
+        icon = ffmpeg.input(item.source)
+        icon = icon.filter('scale', item.image.width, item.image.height, flags='lanczos')
+        return ffmpeg.overlay(stream, icon, x=item.xy[0], y=item.xy[1], format='rgb')
+
+    @staticmethod
+    def _ffmpeg_color(fill: Color) -> str:
+        """Convert a Pillow fill color into FFmpeg's 0xRRGGBB@alpha notation."""
+        rgba = ImageColor.getrgb(fill) if isinstance(fill, str) else tuple(fill)
+        alpha = rgba[3] / 255 if len(rgba) > 3 else 1.0
+        return f"0x{rgba[0]:02X}{rgba[1]:02X}{rgba[2]:02X}@{alpha:.3f}"
+
+
+def pixel_diff(first: Image.Image, second: Image.Image) -> dict:
+    """Mean and maximum absolute per-channel difference between two frames."""
+    diff = ImageChops.difference(first.convert('RGB'), second.convert('RGB'))
+    histogram = diff.histogram()
+    total = sum(histogram)
+    mean_diff = sum((level % 256) * count for level, count in enumerate(histogram)) / total
+    max_diff = max(high for _, high in diff.getextrema())
+
+    return {
+        'mean_diff': mean_diff,
+        'max_diff': max_diff
+    }
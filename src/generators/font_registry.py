@@ -0,0 +1,168 @@
+import os
+import json
+import logging
+import weakref
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from fontTools.ttLib import TTFont
+from PIL import ImageFont
+
+from ..utils.assets import get_manifest
+
+logger = logging.getLogger(__name__)
+
+# System fonts tried after the manifest's font, in priority order; characters
+# missing from one fall through to the next
+FALLBACK_FONT_PATHS = [
+    "/System/Library/Fonts/Times.ttc",  # macOS fallback
+    "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",  # Linux fallback
+    "/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf",  # Docker image fallback
+]
+
+_registry: Optional["FontRegistry"] = None
+_registry_lock = threading.Lock()
+
+
+class FontRegistry:
+    """Character coverage index over the configured fonts.
+
+    Each font's cmap is read once with fontTools and cached on disk, keyed by
+    file size and modification time. The index maps every covered code point
+    to the first font that has it, so resolving a character is a single dict
+    lookup and no font is probed while rendering.
+    """
+
+    def __init__(self, font_paths: Optional[List[str]] = None,
+                 cache_path: str = "data/fonts/.coverage-cache.json"):
+        self.font_paths = [path for path in (font_paths or FALLBACK_FONT_PATHS) if os.path.exists(path)]
+        self.cache_path = Path(cache_path)
+        self._char_fonts: Dict[int, int] = {}
+        # FreeType faces are not safe to share across render threads
+        self._local = threading.local()
+        # Font caches of finished threads, handed to new threads so render
+        # pools created per video still reuse already opened faces
+        self._free_caches: List[Dict[Tuple[Optional[str], int], ImageFont.ImageFont]] = []
+        self._free_caches_lock = threading.Lock()
+        self._build_index()
+
+    @property
+    def primary_font_path(self) -> Optional[str]:
+        return self.font_paths[0] if self.font_paths else None
+
+    def font(self, font_path: Optional[str], size: int) -> ImageFont.ImageFont:
+        """Return a cached font for this thread, or Pillow's default font at that size."""
+        fonts = getattr(self._local, 'fonts', None)
+        if fonts is None:
+            fonts = self._local.fonts = self._acquire_cache()
+
+        key = (font_path, size)
+        if key not in fonts:
+            fonts[key] = ImageFont.truetype(font_path, size) if font_path else ImageFont.load_default(size)
+        return fonts[key]
+
+    def _acquire_cache(self) -> dict:
+        """Take a free font cache for this thread; it is released when the thread is gone."""
+        with self._free_caches_lock:
+            fonts = self._free_caches.pop() if self._free_caches else {}
+        weakref.finalize(threading.current_thread(), self._release_cache, fonts)
+        return fonts
+
+    def _release_cache(self, fonts: dict):
+        with self._free_caches_lock:
+            self._free_caches.append(fonts)
+
+    def runs(self, text: str) -> List[Tuple[str, Optional[str]]]:
+        """Split text into (segment, font_path) runs of characters sharing a font.
+
+        Whitespace and characters no font covers stay in the current run, so
+        plain text in the primary font is always a single run.
+        """
+        if not self.font_paths:
+            return [(text, None)] if text else []
+
+        runs = []
+        run_start = 0
+        run_font = None
+
+        for position, char in enumerate(text):
+            index = self._char_fonts.get(ord(char))
+            if index is None or char.isspace():
+                index = run_font if run_font is not None else 0
+
+            if run_font is None:
+                run_font = index
+            elif index != run_font:
+                runs.append((text[run_start:position], self.font_paths[run_font]))
+                run_start, run_font = position, index
+
+        if run_start < len(text):
+            runs.append((text[run_start:], self.font_paths[run_font]))
+        return runs
+
+    def _build_index(self):
+        cache = self._load_cache()
+        cache_changed = False
+
+        for index, font_path in enumerate(self.font_paths):
+            stat = os.stat(font_path)
+            key = os.path.abspath(font_path)
+            entry = cache.get(key)
+
+            if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime:
+                logger.info(f"Indexing glyph coverage of {font_path}")
+                entry = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime,
+                    'codepoints': self._read_coverage(font_path)
+                }
+                cache[key] = entry
+                cache_changed = True
+
+            for codepoint in entry['codepoints']:
+                self._char_fonts.setdefault(codepoint, index)
+
+        if cache_changed:
+            self._save_cache(cache)
+
+    @staticmethod
+    def _read_coverage(font_path: str) -> List[int]:
+        # fontNumber only matters for collections (.ttc); Pillow also uses face 0
+        with TTFont(font_path, fontNumber=0, lazy=True) as font:
+            return sorted(font.getBestCmap() or {})
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self, cache: dict):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix('.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(cache, file)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write font coverage cache: {e}")
+
+
+def get_font_registry() -> FontRegistry:
+    """Return the process-wide registry, building the coverage index on first use.
+
+    Unlike the other assets, a replaced font file is only picked up after a restart.
+    """
+    global _registry
+
+    with _registry_lock:
+        if _registry is None:
+            # The primary font comes from the asset manifest, resolved against the app dir
+            manifest = get_manifest()
+            primary_font_path = manifest.path("font")
+            _registry = FontRegistry(
+                ([primary_font_path] if primary_font_path else []) + FALLBACK_FONT_PATHS,
+                cache_path=os.path.join(manifest.base_dir, "data/fonts/.coverage-cache.json")
+            )
+        return _registry
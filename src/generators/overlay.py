@@ -0,0 +1,102 @@
+from PIL import Image, ImageDraw, ImageFont
+from typing import List, Optional, Tuple, Union
+
+Box = Tuple[int, int, int, int]
+Color = Union[str, Tuple[int, int, int, int]]
+
+
+class TextItem:
+    """A single line of text drawn at a fixed position with one font."""
+
+    def __init__(self, xy: Tuple[int, int], text: str, fill: Color, font: ImageFont.ImageFont):
+        self.xy = xy
+        self.text = text
+        self.fill = fill
+        self.font = font
+
+    @property
+    def bbox(self) -> Box:
+        left, top, right, bottom = self.font.getbbox(self.text)
+        x, y = self.xy
+        return (x + int(left), y + int(top), x + int(right), y + int(bottom))
+
+
+class IconItem:
+    """An RGBA image pasted at a fixed position using its own alpha as mask."""
+
+    def __init__(self, xy: Tuple[int, int], image: Image.Image, source: Optional[str] = None):
+        self.xy = xy
+        self.image = image
+        # Original file the image was resized from, for backends that load it themselves
+        self.source = source
+
+    @property
+    def bbox(self) -> Box:
+        x, y = self.xy
+        return (x, y, x + self.image.width, y + self.image.height)
+
+
+class Overlay:
+    """Collects overlay draw operations and composites only the area they cover.
+
+    Instead of rasterizing into a full-frame transparent layer, the items are
+    drawn into a layer the size of their bounding box, which is then
+    composited onto the frame at its offset. Pixels outside the box would be
+    fully transparent in a full-frame layer, so the result is identical.
+    """
+
+    # Extra margin around glyph boxes so anti-aliased edges are never clipped
+    PADDING = 2
+
+    def __init__(self, size: Tuple[int, int]):
+        self.size = size
+        self.items: List[Union[TextItem, IconItem]] = []
+
+    def text(self, xy: Tuple[int, int], text: str, fill: Color, font: ImageFont.ImageFont):
+        self.items.append(TextItem(xy, text, fill, font))
+
+    def icon(self, xy: Tuple[int, int], image: Image.Image, source: Optional[str] = None):
+        self.items.append(IconItem(xy, image, source))
+
+    @property
+    def bbox(self) -> Optional[Box]:
+        """Bounding box of all items, padded and clipped to the frame."""
+        if not self.items:
+            return None
+
+        boxes = [item.bbox for item in self.items]
+        left = max(0, min(box[0] for box in boxes) - self.PADDING)
+        top = max(0, min(box[1] for box in boxes) - self.PADDING)
+        right = min(self.size[0], max(box[2] for box in boxes) + self.PADDING)
+        bottom = min(self.size[1], max(box[3] for box in boxes) + self.PADDING)
+
+        if left >= right or top >= bottom:
+            return None
+        return (left, top, right, bottom)
+
+    def render_layer(self) -> Optional[Tuple[Box, Image.Image]]:
+        """Rasterize all items into a region-sized RGBA layer."""
+        box = self.bbox
+        if box is None:
+            return None
+
+        left, top = box[0], box[1]
+        layer = Image.new('RGBA', (box[2] - left, box[3] - top), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+
+        for item in self.items:
+            x, y = item.xy[0] - left, item.xy[1] - top
+            if isinstance(item, TextItem):
+                draw.text((x, y), item.text, fill=item.fill, font=item.font)
+            else:
+                layer.paste(item.image, (x, y), item.image)
+
+        return box, layer
+
+    def composite_onto(self, image: Image.Image) -> Image.Image:
+        """Composite the overlay onto an RGBA image in place and return it."""
+        rendered = self.render_layer()
+        if rendered is not None:
+            box, layer = rendered
+            image.alpha_composite(layer, dest=(box[0], box[1]))
+        return image
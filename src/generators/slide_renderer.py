@@ -1,31 +1,55 @@
-from PIL import Image, ImageDraw, ImageFont
-from typing import Tuple, Optional
-import os
+from PIL import Image, ImageFont
+from typing import List, Tuple, Optional, Union
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+from ..models import AssetManifest
+from .overlay import Overlay
+from .font_registry import FontRegistry, get_font_registry
+
+# A background file, or an image already at slide size (e.g. a background library frame)
+Background = Union[str, Image.Image]
+
 logger = logging.getLogger(__name__)
 
 class SlideRenderer:
-    def __init__(self, width: int = 1080, height: int = 1920):
+    # Resized backgrounds shared by all renderers, keyed by asset content hash and size
+    BACKGROUND_CACHE_SIZE = 6
+    _background_cache: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+    _background_cache_lock = threading.Lock()
+    
+    def __init__(self, width: int = 1080, height: int = 1920, fonts: Optional[FontRegistry] = None,
+                 manifest: Optional[AssetManifest] = None):
         self.width = width
         self.height = height
-        self.font_path = self._get_font_path()
-        
-    def _get_font_path(self) -> str:
-        """Get path to Roboto Serif font."""
-        font_paths = [
-            "data/fonts/RobotoSerif-Regular.ttf",
-            "/System/Library/Fonts/Times.ttc",  # macOS fallback
-            "/usr/share/fonts/truetype/dejavu/DejaVuSerif.ttf",  # Linux fallback
-        ]
-        
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                return font_path
-        
-        # If no font found, use default
-        return None
+        self.manifest = manifest
+        # Per-character font fallback; the first configured font is the primary one
+        self.fonts = fonts or get_font_registry()
+        self.font_path = self.fonts.primary_font_path
+    
+    def _font(self, size: int) -> ImageFont.ImageFont:
+        """Get the primary font at the given size."""
+        return self.fonts.font(self.font_path, size)
+    
+    def _text_runs(self, text: str, size: int) -> List[Tuple[str, ImageFont.ImageFont]]:
+        """Split text into runs, each paired with the first font covering its characters."""
+        return [(segment, self.fonts.font(font_path, size)) for segment, font_path in self.fonts.runs(text)]
+    
+    def _text_width(self, text: str, size: int) -> int:
+        """Measure text as the sum of run advances, so fallback runs do not shift centering."""
+        return int(sum(font.getlength(segment) for segment, font in self._text_runs(text, size)))
+    
+    def _add_text_line(self, overlay: Overlay, xy: Tuple[int, int], text: str, size: int, fill):
+        """Add a line to the overlay as one item per font run, sharing the primary baseline."""
+        x, y = xy
+        primary_ascent = self._font(size).getmetrics()[0]
+        
+        for segment, font in self._text_runs(text, size):
+            run_y = y + primary_ascent - font.getmetrics()[0]
+            overlay.text((int(x), run_y), segment, fill=fill, font=font)
+            x += font.getlength(segment)
     
     def _calculate_font_size(self, text: str, max_width: int, min_size: int = 60, max_size: int = 90) -> int:
         """Calculate optimal font size based on text length."""
@@ -38,7 +62,7 @@ class SlideRenderer:
         else:
             return min_size
     
-    def _wrap_text(self, text: str, font: ImageFont, max_width: int) -> list:
+    def _wrap_text(self, text: str, font_size: int, max_width: int) -> list:
         """Wrap text to fit within max width."""
         words = text.split()
         lines = []
@@ -46,8 +70,7 @@ class SlideRenderer:
         
         for word in words:
             test_line = ' '.join(current_line + [word])
-            bbox = font.getbbox(test_line)
-            text_width = bbox[2] - bbox[0]
+            text_width = self._text_width(test_line, font_size)
             
             if text_width <= max_width:
                 current_line.append(word)
@@ -63,28 +86,9 @@ class SlideRenderer:
         
         return lines
     
-    def render_slide_1(self, quote_text: str, author: str, background_path: str, 
-                      icon_path: Optional[str] = None) -> Image.Image:
-        """Render slide 1: Quote of the day with quote, author, and lotus icon."""
-        logger.info(f"Rendering slide 1 - Quote: {quote_text[:50]}...")
-        logger.info(f"Background path: {background_path}, exists: {os.path.exists(background_path)}")
-        logger.info(f"Icon path: {icon_path}, exists: {os.path.exists(icon_path) if icon_path else 'None'}")
-        
-        # Load background
-        try:
-            background = Image.open(background_path).convert('RGBA')
-            logger.info(f"Background loaded: {background.size}")
-            background = background.resize((self.width, self.height), Image.Resampling.LANCZOS)
-            logger.info(f"Background resized to: {background.size}")
-        except Exception as e:
-            logger.error(f"Failed to load background: {e}")
-            # Create fallback background
-            background = Image.new('RGBA', (self.width, self.height), (50, 50, 50, 255))
-            logger.info("Created fallback background")
-        
-        # Create overlay for text
-        overlay = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+    def layout_slide_1(self, quote_text: str, author: str, icon_path: Optional[str] = None) -> Overlay:
+        """Lay out slide 1 text, author and lotus icon without touching the background."""
+        overlay = Overlay((self.width, self.height))
         
         # Title "Cytat dnia"
         # title_font_size = 50
@@ -98,10 +102,9 @@ class SlideRenderer:
         
         # Quote text
         quote_font_size = self._calculate_font_size(quote_text, self.width - 100)
-        quote_font = ImageFont.truetype(self.font_path, quote_font_size) if self.font_path else ImageFont.load_default()
         
         # Wrap quote text
-        quote_lines = self._wrap_text(quote_text, quote_font, self.width - 100)
+        quote_lines = self._wrap_text(quote_text, quote_font_size, self.width - 100)
         
         # Calculate quote position - moved closer to bottom
         line_height = quote_font_size + 50  # Increased spacing to fill more space
@@ -111,51 +114,39 @@ class SlideRenderer:
         
         # Draw quote lines
         for i, line in enumerate(quote_lines):
-            line_bbox = quote_font.getbbox(line)
-            line_width = line_bbox[2] - line_bbox[0]
+            line_width = self._text_width(line, quote_font_size)
             line_x = (self.width - line_width) // 2
             line_y = quote_start_y + (i * line_height)
-            draw.text((line_x, line_y), line, fill="#3D3D3D", font=quote_font)
+            self._add_text_line(overlay, (line_x, line_y), line, quote_font_size, "#3D3D3D")
         
         # Author
         author_font_size = 40
-        author_font = ImageFont.truetype(self.font_path, author_font_size) if self.font_path else ImageFont.load_default()
         author_text = f"~{author}~"
-        author_bbox = author_font.getbbox(author_text)
-        author_width = author_bbox[2] - author_bbox[0]
+        author_width = self._text_width(author_text, author_font_size)
         author_x = (self.width - author_width) // 2
         author_y = quote_start_y + total_quote_height + 50
         
         # Apply opacity to author color
         author_color = (123, 123, 123, int(255 * 0.7))  # #7B7B7B with 70% opacity
-        draw.text((author_x, author_y), author_text, fill=author_color, font=author_font)
+        self._add_text_line(overlay, (author_x, author_y), author_text, author_font_size, author_color)
         
         # Add lotus icon if provided
-        if icon_path and os.path.exists(icon_path):
+        if icon_path:
             try:
                 icon = Image.open(icon_path).convert('RGBA')
                 icon_size = 80
                 icon = icon.resize((icon_size, icon_size), Image.Resampling.LANCZOS)
                 icon_x = (self.width - icon_size) // 2
                 icon_y = author_y + 80
-                overlay.paste(icon, (icon_x, icon_y), icon)
+                overlay.icon((icon_x, icon_y), icon, source=icon_path)
             except Exception:
                 pass  # Ignore icon errors
         
-        # Combine background and overlay
-        result = Image.alpha_composite(background, overlay)
-        return result.convert('RGB')
+        return overlay
     
-    def render_slide_2(self, reflection_text: str, background_path: str, 
-                      icon_path: Optional[str] = None) -> Image.Image:
-        """Render slide 2: Reflection with reflection text and meditation icon."""
-        # Load background
-        background = Image.open(background_path).convert('RGBA')
-        background = background.resize((self.width, self.height), Image.Resampling.LANCZOS)
-        
-        # Create overlay for text
-        overlay = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+    def layout_slide_2(self, reflection_text: str, icon_path: Optional[str] = None) -> Overlay:
+        """Lay out slide 2 reflection text and meditation icon without touching the background."""
+        overlay = Overlay((self.width, self.height))
         
         # Title "Refleksja" - removed as it was unexpected
         # title_font_size = 50
@@ -169,10 +160,9 @@ class SlideRenderer:
         
         # Reflection text
         reflection_font_size = self._calculate_font_size(reflection_text, self.width - 100)
-        reflection_font = ImageFont.truetype(self.font_path, reflection_font_size) if self.font_path else ImageFont.load_default()
         
         # Wrap reflection text
-        reflection_lines = self._wrap_text(reflection_text, reflection_font, self.width - 100)
+        reflection_lines = self._wrap_text(reflection_text, reflection_font_size, self.width - 100)
         
         # Calculate reflection position - moved closer to bottom
         line_height = reflection_font_size + 50  # Increased spacing to fill more space
@@ -182,68 +172,134 @@ class SlideRenderer:
         
         # Draw reflection lines
         for i, line in enumerate(reflection_lines):
-            line_bbox = reflection_font.getbbox(line)
-            line_width = line_bbox[2] - line_bbox[0]
+            line_width = self._text_width(line, reflection_font_size)
             line_x = (self.width - line_width) // 2
             line_y = reflection_start_y + (i * line_height)
-            draw.text((line_x, line_y), line, fill="#3D3D3D", font=reflection_font)
+            self._add_text_line(overlay, (line_x, line_y), line, reflection_font_size, "#3D3D3D")
         
         # Add meditation icon if provided
-        if icon_path and os.path.exists(icon_path):
+        if icon_path:
             try:
                 icon = Image.open(icon_path).convert('RGBA')
                 icon_size = 80
                 icon = icon.resize((icon_size, icon_size), Image.Resampling.LANCZOS)
                 icon_x = (self.width - icon_size) // 2
                 icon_y = reflection_start_y + total_reflection_height + 50
-                overlay.paste(icon, (icon_x, icon_y), icon)
+                overlay.icon((icon_x, icon_y), icon, source=icon_path)
             except Exception:
                 pass  # Ignore icon errors
         
+        return overlay
+    
+    def load_background(self, background_path: Background) -> Image.Image:
+        """Load a background as RGBA at slide size, falling back to a plain gray frame."""
+        try:
+            background = self._load_scaled(background_path)
+        except Exception as e:
+            logger.error(f"Failed to load background: {e}")
+            # Create fallback background
+            background = Image.new('RGBA', (self.width, self.height), (50, 50, 50, 255))
+            logger.debug("Created fallback background")
+        
+        return background
+    
+    def _load_scaled(self, background_path: Background) -> Image.Image:
+        """Open and resize a background, reusing the result while the asset is unchanged."""
+        if isinstance(background_path, Image.Image):
+            # Library frames are RGB; the one conversion also gives callers their own image to composite onto
+            if background_path.size != (self.width, self.height):
+                return background_path.convert('RGBA').resize((self.width, self.height), Image.Resampling.LANCZOS)
+            return background_path.copy() if background_path.mode == 'RGBA' else background_path.convert('RGBA')
+        
+        content_key = self.manifest.content_key(background_path) if self.manifest else None
+        cache_key = (content_key, self.width, self.height)
+        
+        if content_key:
+            with self._background_cache_lock:
+                cached = self._background_cache.get(cache_key)
+                if cached is not None:
+                    self._background_cache.move_to_end(cache_key)
+                    logger.debug(f"Background cache hit: {background_path}")
+                    # Callers composite in place, so hand out a copy
+                    return cached.copy()
+        
+        background = Image.open(background_path).convert('RGBA')
+        logger.debug(f"Background loaded: {background.size}")
+        background = background.resize((self.width, self.height), Image.Resampling.LANCZOS)
+        logger.debug(f"Background resized to: {background.size}")
+        
+        if content_key:
+            with self._background_cache_lock:
+                self._background_cache[cache_key] = background.copy()
+                while len(self._background_cache) > self.BACKGROUND_CACHE_SIZE:
+                    self._background_cache.popitem(last=False)
+        
+        return background
+    
+    def render_slide_1(self, quote_text: str, author: str, background_path: Background, 
+                      icon_path: Optional[str] = None) -> Image.Image:
+        """Render slide 1: Quote of the day with quote, author, and lotus icon."""
+        logger.debug(f"Rendering slide 1 - Quote: {quote_text[:50]}... (background: {background_path}, icon: {icon_path})")
+        
+        # Load background
+        background = self.load_background(background_path)
+        
+        # Collect text and icon into an overlay composited over its bounding box only
+        overlay = self.layout_slide_1(quote_text, author, icon_path)
+        
         # Combine background and overlay
-        result = Image.alpha_composite(background, overlay)
+        result = overlay.composite_onto(background)
+        return result.convert('RGB')
+    
+    def render_slide_2(self, reflection_text: str, background_path: Background, 
+                      icon_path: Optional[str] = None) -> Image.Image:
+        """Render slide 2: Reflection with reflection text and meditation icon."""
+        # Load background
+        background = self._load_scaled(background_path)
+        
+        # Collect text and icon into an overlay composited over its bounding box only
+        overlay = self.layout_slide_2(reflection_text, icon_path)
+        
+        # Combine background and overlay
+        result = overlay.composite_onto(background)
         return result.convert('RGB')
     
     def render_slide_3(self, background_path: str) -> Image.Image:
         """Render slide 3: Final slide with background only (text from the provided image)."""
-        logger.info(f"Rendering slide 3 with background: {background_path}")
+        logger.debug(f"Rendering slide 3 with background: {background_path}")
         
         # Load background
-        try:
-            background = Image.open(background_path).convert('RGBA')
-            logger.info(f"Background loaded: {background.size}")
-            background = background.resize((self.width, self.height), Image.Resampling.LANCZOS)
-            logger.info(f"Background resized to: {background.size}")
-        except Exception as e:
-            logger.error(f"Failed to load background: {e}")
-            # Create fallback background
-            background = Image.new('RGBA', (self.width, self.height), (50, 50, 50, 255))
-            logger.info("Created fallback background")
+        background = self.load_background(background_path)
         
         # Return the background as-is since it already contains the text
         return background.convert('RGB')
     
-    def add_watermark(self, image: Image.Image, text: str = "jakmedytowac.pl") -> Image.Image:
-        """Add watermark to image."""
-        watermark_overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(watermark_overlay)
+    def layout_watermark(self, size: Tuple[int, int], text: str = "jakmedytowac.pl") -> Overlay:
+        """Lay out the watermark in the bottom right corner of a frame of the given size."""
+        watermark_overlay = Overlay(size)
         
         # Watermark font
         watermark_font_size = 24
-        watermark_font = ImageFont.truetype(self.font_path, watermark_font_size) if self.font_path else ImageFont.load_default()
+        watermark_font = self._font(watermark_font_size)
         
         # Position watermark in bottom right corner
         watermark_bbox = watermark_font.getbbox(text)
         watermark_width = watermark_bbox[2] - watermark_bbox[0]
         watermark_height = watermark_bbox[3] - watermark_bbox[1]
         
-        watermark_x = image.width - watermark_width - 20
-        watermark_y = image.height - watermark_height - 20
+        watermark_x = size[0] - watermark_width - 20
+        watermark_y = size[1] - watermark_height - 20
         
         # Semi-transparent white color
         watermark_color = (255, 255, 255, 180)
-        draw.text((watermark_x, watermark_y), text, fill=watermark_color, font=watermark_font)
+        watermark_overlay.text((watermark_x, watermark_y), text, fill=watermark_color, font=watermark_font)
+        
+        return watermark_overlay
+    
+    def add_watermark(self, image: Image.Image, text: str = "jakmedytowac.pl") -> Image.Image:
+        """Add watermark to image."""
+        watermark_overlay = self.layout_watermark(image.size, text)
         
-        # Apply watermark
-        result = Image.alpha_composite(image.convert('RGBA'), watermark_overlay)
+        # Apply watermark to the corner region only
+        result = watermark_overlay.composite_onto(image.convert('RGBA'))
         return result.convert('RGB')
\ No newline at end of file
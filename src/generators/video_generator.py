@@ -1,100 +1,145 @@
 import os
+import re
+import shutil
+import contextvars
 import tempfile
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, List, Optional, Tuple, Union
 import ffmpeg
 from PIL import Image
 
-from ..models import Quote, GeneratedVideo, VideoSpecs, VideoSettings
+from ..models import AssetManifest, Quote, GeneratedVideo, VideoSpecs, VideoSettings
+from ..utils.assets import get_manifest
+from ..utils.background_library import BackgroundLibrary, LibraryFrame, get_background_library
 from .slide_renderer import SlideRenderer
+from .ffmpeg_renderer import FFmpegSlideRenderer, pixel_diff
+from .animation import TextRevealAnimator
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class VideoGenerator:
-    def __init__(self):
-        self.renderer = SlideRenderer()
+    # "pillow" rasterizes slides to PNG first, "ffmpeg" draws them inside the encode graph
+    RENDER_BACKENDS = ("pillow", "ffmpeg")
+    
+    # Calculate timing for cross-fade with 3 slides
+    # Total duration = 15s
+    # With two transitions of 1s each, we need:
+    # slide_1_duration + slide_2_duration + slide_3_duration - 2 * transition_duration = 15
+    # 6.5 + 6.5 + 4 - 2 = 15
+    SLIDE_DURATIONS = (6.5, 6.5, 4.0)
+    
+    # "faststart" moves the index to the front after encoding (a second pass over
+    # the file), "fragmented" writes self-contained fragments as they are encoded
+    OUTPUT_MODES = ("faststart", "fragmented")
+    FRAGMENTED_MOVFLAGS = "frag_keyframe+empty_moov+default_base_moof"
+    
+    # Length of the preview segments streamed to the player in fragmented mode
+    PREVIEW_SEGMENT_SECONDS = 1
+    
+    def __init__(self, render_workers: Optional[int] = None, render_backend: str = "pillow",
+                 animation: Optional[str] = None, manifest: Optional[AssetManifest] = None,
+                 output_mode: str = "faststart", background_library: Optional[BackgroundLibrary] = None,
+                 ffmpeg_threads: Optional[int] = None):
+        if render_backend not in self.RENDER_BACKENDS:
+            raise ValueError(f"Unknown render backend: {render_backend} (expected one of {', '.join(self.RENDER_BACKENDS)})")
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output_mode} (expected one of {', '.join(self.OUTPUT_MODES)})")
+        if animation and animation not in TextRevealAnimator.MODES:
+            raise ValueError(f"Unknown animation mode: {animation} (expected one of {', '.join(TextRevealAnimator.MODES)})")
+        if animation and render_backend != "pillow":
+            raise ValueError("Animated text reveals are only supported by the pillow render backend")
+        
+        self.render_backend = render_backend
+        self.output_mode = output_mode
+        # Text reveal on the quote slide: None for a static slide, "word" or "fade"
+        self.animation = animation
+        # Asset paths, hashes and metadata are resolved once per process
+        self.manifest = manifest or get_manifest()
+        self.renderer = SlideRenderer(manifest=self.manifest)
         self.specs = VideoSpecs()
         self.settings = VideoSettings()
+        # Slides are independent, so they are rendered on a small thread pool.
+        # Pillow releases the GIL for resize, compositing and PNG encoding.
+        self.render_workers = render_workers or min(3, os.cpu_count() or 1)
+        # Encoder threads; None lets FFmpeg use every core
+        self.ffmpeg_threads = ffmpeg_threads
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
         
-        # Resource paths - resolve absolute paths
-        base_dir = Path.cwd()
-        self.background_1_path = str(base_dir / "data/backgrounds/background_1.jpg")
-        self.background_2_path = str(base_dir / "data/backgrounds/background_2.jpg")
-        self.background_3_path = str(base_dir / "data/backgrounds/background_3.jpg")
-        self.lotus_icon_path = str(base_dir / "data/icons/lotus.png")
-        self.meditation_icon_path = str(base_dir / "data/icons/meditation.png")
-        self.background_music_path = str(base_dir / "data/audio/background-music-18s.mp3")
-    
-    def create_video(self, quote: Quote) -> GeneratedVideo:
-        """Create a complete video from a quote."""
+        # Resource paths from the asset manifest; None for missing assets
+        self.background_1_path = self.manifest.path("background_1")
+        self.background_2_path = self.manifest.path("background_2")
+        self.background_3_path = self.manifest.path("background_3")
+        self.lotus_icon_path = self.manifest.path("lotus_icon")
+        self.meditation_icon_path = self.manifest.path("meditation_icon")
+        self.background_music_path = self.manifest.path("background_music")
+        
+        # Pre-scaled frames for slides 1 and 2; None keeps the fixed backgrounds
+        self.background_library = background_library or get_background_library()
+    
+    def create_video(self, quote: Quote, segment_dir: Optional[Path] = None) -> GeneratedVideo:
+        """Create a complete video from a quote.
+        
+        With `segment_dir` (fragmented output mode only), preview segments are
+        also written there while encoding; see create_video_progressive.
+        """
         start_time = time.time()
         logger.info(f"Starting video generation for quote: {quote.quote[:50]}...")
         
         # Generate filename
-        quote_snippet = quote.quote[:30].replace(" ", "_").replace(",", "").replace(".", "")
+        # Letters, digits and underscores only: the name also ends up in FFmpeg's
+        # tee target, where quotes, "|", "[", "]" and ":" are syntax
+        quote_snippet = re.sub(r"\W+", "_", quote.quote[:30]).strip("_") or "video"
         filename = f"{quote_snippet}_{int(time.time())}.mp4"
         output_path = self.output_dir / filename
-        logger.info(f"Output path: {output_path}")
-        
-        # Check if background images exist
-        logger.info(f"Checking background 1: {self.background_1_path} - exists: {os.path.exists(self.background_1_path)}")
-        logger.info(f"Checking background 2: {self.background_2_path} - exists: {os.path.exists(self.background_2_path)}")
-        logger.info(f"Checking background 3: {self.background_3_path} - exists: {os.path.exists(self.background_3_path)}")
-        logger.info(f"Checking lotus icon: {self.lotus_icon_path} - exists: {os.path.exists(self.lotus_icon_path)}")
-        logger.info(f"Checking meditation icon: {self.meditation_icon_path} - exists: {os.path.exists(self.meditation_icon_path)}")
-        logger.info(f"Checking background music: {self.background_music_path} - exists: {os.path.exists(self.background_music_path)}")
+        logger.debug(f"Output path: {output_path}")
         
         try:
             # Create temporary directory for slides
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
-                logger.info(f"Created temp directory: {temp_path}")
+                logger.debug(f"Created temp directory: {temp_path}")
+                backgrounds = self._pick_backgrounds()
                 
-                # Render slides
-                logger.info("Rendering slide 1...")
-                slide_1 = self.renderer.render_slide_1(
-                    quote.quote, 
-                    quote.author, 
-                    self.background_1_path,
-                    self.lotus_icon_path if os.path.exists(self.lotus_icon_path) else None
-                )
-                slide_1 = self.renderer.add_watermark(slide_1)
-                slide_1_path = temp_path / "slide_1.png"
-                slide_1.save(slide_1_path)
-                logger.info(f"Slide 1 saved: {slide_1_path} (size: {slide_1.size})")
-                
-                logger.info("Rendering slide 2...")
-                slide_2 = self.renderer.render_slide_2(
-                    quote.reflection,
-                    self.background_2_path,
-                    self.meditation_icon_path if os.path.exists(self.meditation_icon_path) else None
-                )
-                slide_2 = self.renderer.add_watermark(slide_2)
-                slide_2_path = temp_path / "slide_2.png"
-                slide_2.save(slide_2_path)
-                logger.info(f"Slide 2 saved: {slide_2_path} (size: {slide_2.size})")
-                
-                logger.info("Rendering slide 3...")
-                slide_3 = self.renderer.render_slide_3(self.background_3_path)
-                slide_3 = self.renderer.add_watermark(slide_3)
-                slide_3_path = temp_path / "slide_3.png"
-                slide_3.save(slide_3_path)
-                logger.info(f"Slide 3 saved: {slide_3_path} (size: {slide_3.size})")
-                
-                # Create video with FFmpeg
-                logger.info("Creating video with FFmpeg...")
-                self._create_video_with_ffmpeg(
-                    slide_1_path, 
-                    slide_2_path,
-                    slide_3_path,
-                    output_path
-                )
+                # Thumbnails are written from the in-memory cover slide while FFmpeg encodes
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail") as thumbnail_pool:
+                    if self.render_backend == "ffmpeg":
+                        # Slide 1 never exists as an image here, so render just the cover with Pillow
+                        cover = lambda: self.renderer.add_watermark(self._slide_jobs(quote, backgrounds)[0]())
+                        thumbnails = self._submit(thumbnail_pool, self._write_thumbnails, cover, output_path)
+                        
+                        # Draw text, icons and watermark inside the encode graph
+                        logger.debug("Creating video with FFmpeg-native slide rendering...")
+                        slide_streams = self._describe_slides(quote, temp_path, backgrounds=backgrounds)
+                        self._encode_slides(slide_streams, output_path, segment_dir=segment_dir)
+                    elif self.animation:
+                        slide_streams, animator = self._prepare_animated_slides(quote, temp_path, backgrounds)
+                        thumbnails = self._submit(thumbnail_pool, self._write_thumbnails, animator.final_frame, output_path)
+                        
+                        # Stream slide 1 frames to FFmpeg while static slides come from PNGs
+                        logger.debug(f"Creating video with '{self.animation}' text reveal...")
+                        self._encode_slides(slide_streams, output_path, frames=animator.frames(), segment_dir=segment_dir)
+                    else:
+                        # Render slides concurrently; results come back in slide order
+                        slides = self._render_slides(quote, temp_path, backgrounds)
+                        (slide_1_path, cover), (slide_2_path, _), (slide_3_path, _) = slides
+                        thumbnails = self._submit(thumbnail_pool, self._write_thumbnails, cover, output_path)
+                        
+                        # Create video with FFmpeg
+                        logger.debug("Creating video with FFmpeg...")
+                        self._create_video_with_ffmpeg(
+                            slide_1_path, 
+                            slide_2_path,
+                            slide_3_path,
+                            output_path,
+                            segment_dir
+                        )
+                    
+                    thumbnail_paths = thumbnails.result()
                 
                 # Verify output file
                 if output_path.exists():
@@ -110,6 +155,7 @@ class VideoGenerator:
             return GeneratedVideo(
                 quote=quote,
                 file_path=str(output_path),
+                thumbnails=thumbnail_paths,
                 generation_time=generation_time,
                 specs=self.specs,
                 settings=self.settings
@@ -117,33 +163,279 @@ class VideoGenerator:
             
         except Exception as e:
             logger.error(f"Video generation failed: {str(e)}")
+            # Thumbnails are written alongside the encode; don't leave them without a video
+            self._remove_thumbnails(output_path)
             raise Exception(f"Video generation failed: {str(e)}")
     
-    def _create_video_with_ffmpeg(self, slide_1_path: Path, slide_2_path: Path, slide_3_path: Path, output_path: Path):
+    def create_video_progressive(self, quote: Quote) -> Iterator[Union[str, GeneratedVideo]]:
+        """Create a fragmented video, yielding preview segments while it encodes.
+        
+        Yields the path of each MPEG-TS preview segment as soon as FFmpeg has
+        finished it, then the GeneratedVideo. The segments are deleted once
+        the generator is exhausted or closed.
+        """
+        if self.output_mode != "fragmented":
+            raise ValueError("Progressive delivery requires the fragmented output mode")
+        
+        segment_dir = Path(tempfile.mkdtemp(prefix="preview_"))
+        result = {}
+        
+        def encode():
+            try:
+                result['video'] = self.create_video(quote, segment_dir=segment_dir)
+            except Exception as e:
+                result['error'] = e
+        
+        # Keep the caller's context so the encode thread logs under the same job id
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(encode,), name="encode", daemon=True)
+        worker.start()
+        
+        try:
+            sent = 0
+            while True:
+                finished = not worker.is_alive()
+                segments = self._completed_segments(segment_dir)
+                for segment in segments[sent:]:
+                    yield segment
+                sent = len(segments)
+                
+                if finished:
+                    break
+                worker.join(timeout=0.25)
+            
+            if 'error' in result:
+                raise result['error']
+            yield result['video']
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _completed_segments(segment_dir: Path) -> List[str]:
+        """Return finished segment paths; FFmpeg appends to the list as each one closes."""
+        try:
+            listing = (segment_dir / "segments.csv").read_text(encoding='utf-8')
+        except OSError:
+            return []
+        
+        # Only complete lines; the last one may still be being written
+        lines = listing.split("\n")[:-1]
+        return [str(segment_dir / line.split(",")[0]) for line in lines if line]
+    
+    def compare_backends(self, quote: Quote, tolerance: float = 2.0) -> dict:
+        """Render every slide with both backends and compare them pixel by pixel.
+        
+        A slide passes when the mean absolute per-channel difference is at most
+        `tolerance` (in 0-255 levels).
+        """
+        results = {}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            composer = FFmpegSlideRenderer(self.renderer, temp_path, self.specs.fps)
+            
+            pillow_slides = [self.renderer.add_watermark(render()) for render in self._slide_jobs(quote)]
+            ffmpeg_streams = self._describe_slides(quote, temp_path, composer)
+            
+            for number, (pillow_slide, stream) in enumerate(zip(pillow_slides, ffmpeg_streams), start=1):
+                frame_path = temp_path / f"ffmpeg_slide_{number}.png"
+                composer.render_frame(stream, frame_path)
+                
+                with Image.open(frame_path) as ffmpeg_slide:
+                    diff = pixel_diff(pillow_slide, ffmpeg_slide)
+                
+                diff['passed'] = diff['mean_diff'] <= tolerance
+                results[f"slide_{number}"] = diff
+                logger.info(f"Slide {number} backend diff: mean {diff['mean_diff']:.3f}, max {diff['max_diff']}")
+        
+        return results
+    
+    def _icon_paths(self):
+        """Return lotus and meditation icon paths, or None for missing icons."""
+        return self.lotus_icon_path, self.meditation_icon_path
+    
+    def _pick_backgrounds(self) -> list:
+        """Return the background of each slide, drawing slides 1 and 2 from the library if there is one.
+        
+        Slide 3 always keeps its fixed background, which has the closing text baked in.
+        """
+        backgrounds = [self.background_1_path, self.background_2_path, self.background_3_path]
+        if self.background_library:
+            for index in range(2):
+                backgrounds[index] = self.background_library.choose()
+                logger.debug(f"Slide {index + 1} background from library: {backgrounds[index].name}")
+        return backgrounds
+    
+    def _backgrounds(self, backgrounds: Optional[list], as_paths: bool = False) -> list:
+        """Resolve picked backgrounds to frame images for Pillow, or to source files for FFmpeg."""
+        if backgrounds is None:
+            return [self.background_1_path, self.background_2_path, self.background_3_path]
+        return [
+            (background.source_path if as_paths else background.image) if isinstance(background, LibraryFrame) else background
+            for background in backgrounds
+        ]
+    
+    def _slide_jobs(self, quote: Quote, backgrounds: Optional[list] = None) -> List[Callable[[], Image.Image]]:
+        """Return one Pillow render callable per slide, in slide order."""
+        lotus_icon, meditation_icon = self._icon_paths()
+        background_1, background_2, background_3 = self._backgrounds(backgrounds)
+        
+        return [
+            lambda: self.renderer.render_slide_1(quote.quote, quote.author, background_1, lotus_icon),
+            lambda: self.renderer.render_slide_2(quote.reflection, background_2, meditation_icon),
+            lambda: self.renderer.render_slide_3(background_3),
+        ]
+    
+    def _prepare_animated_slides(self, quote: Quote, temp_path: Path, backgrounds: Optional[list] = None):
+        """Return slide inputs and the animator whose frames feed the piped quote slide."""
+        jobs = self._slide_jobs(quote, backgrounds)
+        slide_1_duration, slide_2_duration, slide_3_duration = self.SLIDE_DURATIONS
+        
+        # Slides 2 and 3 stay static and are rendered on the pool as usual
+        with ThreadPoolExecutor(max_workers=self.render_workers, thread_name_prefix="slide") as pool:
+            futures = [
+                self._submit(pool, self._render_and_save_slide, job, temp_path / f"slide_{number}.png")
+                for number, job in enumerate(jobs[1:], start=2)
+            ]
+            
+            lotus_icon, _ = self._icon_paths()
+            background_1 = self._backgrounds(backgrounds)[0]
+            background = self.renderer.add_watermark(self.renderer.load_background(background_1))
+            animator = TextRevealAnimator(
+                background,
+                self.renderer.layout_slide_1(quote.quote, quote.author, lotus_icon),
+                fps=self.specs.fps,
+                duration=slide_1_duration,
+                mode=self.animation,
+                reveal_duration=self.specs.reveal_duration
+            )
+            (slide_2_path, _), (slide_3_path, _) = [future.result() for future in futures]
+        
+        slide_1_input = ffmpeg.input(
+            'pipe:',
+            format='rawvideo',
+            pix_fmt='rgb24',
+            s=f'{self.specs.width}x{self.specs.height}',
+            framerate=self.specs.fps
+        )
+        slide_2_input = ffmpeg.input(str(slide_2_path), loop=1, t=slide_2_duration, framerate=self.specs.fps)
+        slide_3_input = ffmpeg.input(str(slide_3_path), loop=1, t=slide_3_duration, framerate=self.specs.fps)
+        
+        return [slide_1_input, slide_2_input, slide_3_input], animator
+    
+    def _describe_slides(self, quote: Quote, temp_path: Path, composer: Optional[FFmpegSlideRenderer] = None,
+                         backgrounds: Optional[list] = None) -> list:
+        """Describe all slides as FFmpeg filter chains using the SlideRenderer layout."""
+        composer = composer or FFmpegSlideRenderer(self.renderer, temp_path, self.specs.fps)
+        lotus_icon, meditation_icon = self._icon_paths()
+        # FFmpeg scales inside the graph, so library picks are read from their source files
+        background_1, background_2, background_3 = self._backgrounds(backgrounds, as_paths=True)
+        slide_1_duration, slide_2_duration, slide_3_duration = self.SLIDE_DURATIONS
+        
+        return [
+            composer.slide_stream(
+                background_1,
+                self.renderer.layout_slide_1(quote.quote, quote.author, lotus_icon),
+                slide_1_duration
+            ),
+            composer.slide_stream(
+                background_2,
+                self.renderer.layout_slide_2(quote.reflection, meditation_icon),
+                slide_2_duration
+            ),
+            composer.slide_stream(background_3, None, slide_3_duration),
+        ]
+    
+    def _render_slides(self, quote: Quote, temp_path: Path, backgrounds: Optional[list] = None) -> List[Tuple[Path, Image.Image]]:
+        """Render, watermark and save slides on the thread pool, in slide order."""
+        jobs = self._slide_jobs(quote, backgrounds)
+        
+        logger.debug(f"Rendering {len(jobs)} slides with {self.render_workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=self.render_workers, thread_name_prefix="slide") as pool:
+            futures = [
+                self._submit(pool, self._render_and_save_slide, job, temp_path / f"slide_{number}.png")
+                for number, job in enumerate(jobs, start=1)
+            ]
+            # Collect in submission order so output does not depend on scheduling
+            return [future.result() for future in futures]
+    
+    @staticmethod
+    def _submit(pool: ThreadPoolExecutor, fn, *args):
+        """Submit work carrying the caller's context, so log records keep the job id."""
+        return pool.submit(contextvars.copy_context().run, fn, *args)
+    
+    def _render_and_save_slide(self, render: Callable[[], Image.Image], slide_path: Path) -> Tuple[Path, Image.Image]:
+        """Render a single slide, apply the watermark and save it as PNG."""
+        slide = self.renderer.add_watermark(render())
+        slide.save(slide_path)
+        logger.debug(f"Slide saved: {slide_path} (size: {slide.size})")
+        return slide_path, slide
+    
+    def _write_thumbnails(self, cover: Union[Image.Image, Callable[[], Image.Image]], output_path: Path) -> List[str]:
+        """Save the cover slide next to the video at every configured thumbnail width."""
+        try:
+            image = cover() if callable(cover) else cover
+            image_format = self._thumbnail_format()
+            
+            thumbnail_paths = []
+            for width in self.settings.thumbnail_widths:
+                height = round(image.height * width / image.width)
+                thumbnail = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+                thumbnail_path = self._thumbnail_path(output_path, width)
+                thumbnail.save(thumbnail_path, format=image_format, quality=self.settings.thumbnail_quality)
+                thumbnail_paths.append(str(thumbnail_path))
+            
+            logger.debug(f"Thumbnails saved: {', '.join(thumbnail_paths)}")
+            return thumbnail_paths
+        except (OSError, ValueError) as e:
+            # Image and file errors should not cost the finished video; anything else is a bug
+            logger.warning(f"Thumbnail generation failed: {e}", exc_info=True)
+            self._remove_thumbnails(output_path)
+            return []
+    
+    def _thumbnail_format(self) -> str:
+        return self.settings.thumbnail_format.upper().replace("JPG", "JPEG")
+    
+    def _thumbnail_path(self, output_path: Path, width: int) -> Path:
+        image_format = self._thumbnail_format()
+        extension = "jpg" if image_format == "JPEG" else image_format.lower()
+        return output_path.with_name(f"{output_path.stem}_{width}w.{extension}")
+    
+    def _remove_thumbnails(self, output_path: Path):
+        """Delete whatever thumbnails of this video were written."""
+        for width in self.settings.thumbnail_widths:
+            self._thumbnail_path(output_path, width).unlink(missing_ok=True)
+    
+    def _create_video_with_ffmpeg(self, slide_1_path: Path, slide_2_path: Path, slide_3_path: Path, output_path: Path,
+                                  segment_dir: Optional[Path] = None):
         """Create video using FFmpeg with slides and smooth cross-fade transition."""
-        logger.info(f"FFmpeg creating video from {slide_1_path}, {slide_2_path}, and {slide_3_path}")
-        logger.info(f"Slide 1 exists: {slide_1_path.exists()}, Slide 2 exists: {slide_2_path.exists()}, Slide 3 exists: {slide_3_path.exists()}")
+        logger.debug(f"FFmpeg creating video from {slide_1_path}, {slide_2_path}, and {slide_3_path}")
+        
+        slide_1_duration, slide_2_duration, slide_3_duration = self.SLIDE_DURATIONS
+        
+        # Create input streams
+        logger.debug(f"Creating input streams with cross-fade transitions")
+        slide_1_input = ffmpeg.input(str(slide_1_path), loop=1, t=slide_1_duration, framerate=self.specs.fps)
+        slide_2_input = ffmpeg.input(str(slide_2_path), loop=1, t=slide_2_duration, framerate=self.specs.fps)
+        slide_3_input = ffmpeg.input(str(slide_3_path), loop=1, t=slide_3_duration, framerate=self.specs.fps)
+        
+        self._encode_slides([slide_1_input, slide_2_input, slide_3_input], output_path, segment_dir=segment_dir)
+    
+    def _encode_slides(self, slide_streams: list, output_path: Path, frames: Optional[Iterator[bytes]] = None,
+                       segment_dir: Optional[Path] = None):
+        """Cross-fade the three slide streams, add music and encode the final video.
+        
+        When `frames` is given, the first slide reads raw frames from stdin and
+        they are written to FFmpeg one at a time as they are produced.
+        """
+        slide_1_input, slide_2_input, slide_3_input = slide_streams
         
         try:
-            # Calculate timing for cross-fade with 3 slides
-            # Total duration = 15s
-            # With two transitions of 1s each, we need:
-            # slide_1_duration + slide_2_duration + slide_3_duration - 2 * transition_duration = 15
-            # 6.5 + 6.5 + 4 - 2 = 15
-            slide_1_duration = 6.5
-            slide_2_duration = 6.5
-            slide_3_duration = 4.0
+            slide_1_duration, slide_2_duration, _ = self.SLIDE_DURATIONS
             transition_1_start = slide_1_duration - self.specs.transition_duration
             transition_2_start = slide_1_duration + slide_2_duration - 2 * self.specs.transition_duration
             
-            # Create input streams
-            logger.info(f"Creating input streams with cross-fade transitions")
-            slide_1_input = ffmpeg.input(str(slide_1_path), loop=1, t=slide_1_duration)
-            slide_2_input = ffmpeg.input(str(slide_2_path), loop=1, t=slide_2_duration)
-            slide_3_input = ffmpeg.input(str(slide_3_path), loop=1, t=slide_3_duration)
-            
             # Create first cross-fade between slide 1 and 2
-            logger.info(f"Applying first cross-fade transition at {transition_1_start}s")
+            logger.debug(f"Applying first cross-fade transition at {transition_1_start}s")
             video_1_2 = ffmpeg.filter(
                 [slide_1_input, slide_2_input], 
                 'xfade', 
@@ -153,7 +445,7 @@ class VideoGenerator:
             )
             
             # Create second cross-fade between result and slide 3
-            logger.info(f"Applying second cross-fade transition at {transition_2_start}s")
+            logger.debug(f"Applying second cross-fade transition at {transition_2_start}s")
             video = ffmpeg.filter(
                 [video_1_2, slide_3_input], 
                 'xfade', 
@@ -162,9 +454,13 @@ class VideoGenerator:
                 offset=transition_2_start
             )
             
+            target, container_options = self._container_options(output_path, segment_dir)
+            if self.ffmpeg_threads:
+                container_options = dict(container_options, threads=self.ffmpeg_threads)
+            
             # Add background music if available
-            if os.path.exists(self.background_music_path):
-                logger.info(f"Adding background music from {self.background_music_path}")
+            if self.background_music_path:
+                logger.debug(f"Adding background music from {self.background_music_path}")
                 audio = ffmpeg.input(self.background_music_path)
                 audio = audio.filter('volume', 0.3)  # Lower volume
                 audio = audio.filter('atrim', duration=self.specs.duration)
@@ -175,32 +471,35 @@ class VideoGenerator:
                 # Combine video and audio
                 output = ffmpeg.output(
                     video, audio,
-                    str(output_path),
+                    target,
                     vcodec='libx264',
                     acodec='aac',
                     r=self.specs.fps,
                     s=f'{self.specs.width}x{self.specs.height}',
                     pix_fmt='yuv420p',
-                    movflags='faststart',
-                    shortest=None
+                    shortest=None,
+                    **container_options
                 )
             else:
-                logger.info("No background music found, creating video-only output")
+                logger.debug("No background music found, creating video-only output")
                 # Video only (no audio)
                 output = ffmpeg.output(
                     video,
-                    str(output_path),
+                    target,
                     vcodec='libx264',
                     r=self.specs.fps,
                     s=f'{self.specs.width}x{self.specs.height}',
                     pix_fmt='yuv420p',
-                    movflags='faststart'
+                    **container_options
                 )
             
             # Run FFmpeg with verbose output for debugging
-            logger.info("Running FFmpeg command...")
-            ffmpeg.run(output, overwrite_output=True, quiet=False)
-            logger.info("FFmpeg command completed")
+            logger.debug("Running FFmpeg command...")
+            if frames is None:
+                ffmpeg.run(output, overwrite_output=True, quiet=False)
+            else:
+                self._run_with_frames(output, frames)
+            logger.debug("FFmpeg command completed")
             
         except ffmpeg.Error as e:
             error_msg = f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}"
@@ -211,6 +510,45 @@ class VideoGenerator:
             logger.error(error_msg)
             raise Exception(error_msg)
     
+    def _container_options(self, output_path: Path, segment_dir: Optional[Path] = None):
+        """Return the FFmpeg output target and muxer options for the output mode."""
+        if self.output_mode == "faststart":
+            return str(output_path), {'movflags': 'faststart'}
+        
+        # One keyframe per second so fragments and preview segments flush every second
+        options = {'g': self.specs.fps}
+        if segment_dir is None:
+            return str(output_path), dict(options, movflags=self.FRAGMENTED_MOVFLAGS)
+        
+        # Encode once and mux twice via tee: the final fragmented MP4 and MPEG-TS
+        # preview segments. Global headers give the MP4 its codec config up front.
+        target = (
+            f"[f=mp4:movflags={self.FRAGMENTED_MOVFLAGS}]{output_path}|"
+            f"[f=segment:segment_time={self.PREVIEW_SEGMENT_SECONDS}:segment_format=mpegts:"
+            f"segment_list={segment_dir / 'segments.csv'}:segment_list_type=csv]"
+            f"{segment_dir / 'segment_%03d.ts'}"
+        )
+        return target, dict(options, format='tee', flags='+global_header')
+    
+    def _run_with_frames(self, output, frames: Iterator[bytes]):
+        """Run FFmpeg while streaming raw frames to its stdin without buffering the clip."""
+        process = ffmpeg.run_async(output, pipe_stdin=True, overwrite_output=True)
+        try:
+            for frame in frames:
+                process.stdin.write(frame)
+        except BrokenPipeError:
+            # FFmpeg exited early; its return code below carries the failure
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            return_code = process.wait()
+        
+        if return_code != 0:
+            raise Exception(f"FFmpeg exited with code {return_code}")
+    
     def get_video_info(self, video_path: str) -> dict:
         """Get information about generated video."""
         try:
@@ -1,4 +1,5 @@
 from .quote import Quote, QuoteStatus
 from .video import VideoSpecs, VideoSettings, GeneratedVideo
+from .asset import AssetInfo, AssetManifest
 
-__all__ = ["Quote", "QuoteStatus", "VideoSpecs", "VideoSettings", "GeneratedVideo"]
\ No newline at end of file
+__all__ = ["Quote", "QuoteStatus", "VideoSpecs", "VideoSettings", "GeneratedVideo", "AssetInfo", "AssetManifest"]
\ No newline at end of file
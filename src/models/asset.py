@@ -0,0 +1,36 @@
+import os
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class AssetInfo(BaseModel):
+    path: str
+    required: bool = True
+    exists: bool = False
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+    sha256: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration: Optional[float] = None
+
+class AssetManifest(BaseModel):
+    base_dir: str
+    assets: Dict[str, AssetInfo] = {}
+    
+    def path(self, name: str) -> Optional[str]:
+        """Absolute path of an asset, or None if it is unknown or missing."""
+        asset = self.assets.get(name)
+        if asset is None or not asset.exists:
+            return None
+        return os.path.join(self.base_dir, asset.path)
+    
+    def content_key(self, path: Optional[str]) -> Optional[str]:
+        """Content hash for an asset path, usable as a cache key."""
+        for name, asset in self.assets.items():
+            if asset.exists and self.path(name) == path:
+                return asset.sha256
+        return None
+    
+    def missing(self) -> List[str]:
+        """Names of required assets that are not present."""
+        return [name for name, asset in self.assets.items() if asset.required and not asset.exists]
@@ -4,6 +4,8 @@ from enum import Enum
 
 class QuoteStatus(str, Enum):
     UNUSED = "unused"
+    # Claimed by a running generation, so no other one picks it
+    IN_PROGRESS = "in_progress"
     USED = "used"
 
 class Quote(BaseModel):
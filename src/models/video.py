@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from .quote import Quote
 
 class VideoSpecs(BaseModel):
@@ -10,6 +10,7 @@ class VideoSpecs(BaseModel):
     slide_duration: float = 6.0
     slide_3_duration: float = 3.0
     transition_duration: float = 1.0
+    reveal_duration: float = 3.0
     
 class VideoSettings(BaseModel):
     font_family: str = "Roboto Serif"
@@ -19,10 +20,14 @@ class VideoSettings(BaseModel):
     min_font_size: int = 60
     max_font_size: int = 90
     watermark_text: str = "jakmedytowac.pl"
+    thumbnail_widths: List[int] = [1080, 540]
+    thumbnail_format: str = "webp"
+    thumbnail_quality: int = 85
     
 class GeneratedVideo(BaseModel):
     quote: Quote
     file_path: Optional[str] = None
+    thumbnails: List[str] = []
     generation_time: Optional[float] = None
     specs: VideoSpecs = VideoSpecs()
     settings: VideoSettings = VideoSettings()
\ No newline at end of file
@@ -0,0 +1,156 @@
+import os
+import sys
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+import ffmpeg
+from PIL import Image
+
+from ..models import AssetInfo, AssetManifest
+
+logger = logging.getLogger(__name__)
+
+# Every asset the generator uses: name -> (path relative to the app dir, required)
+ASSET_SPECS = {
+    "background_1": ("data/backgrounds/background_1.jpg", True),
+    "background_2": ("data/backgrounds/background_2.jpg", True),
+    "background_3": ("data/backgrounds/background_3.jpg", True),
+    "lotus_icon": ("data/icons/lotus.png", False),
+    "meditation_icon": ("data/icons/meditation.png", False),
+    "background_music": ("data/audio/background-music-18s.mp3", False),
+    "font": ("data/fonts/RobotoSerif-Regular.ttf", True),
+}
+
+MANIFEST_PATH = "data/assets.json"
+
+# How often get_manifest() re-stats the assets to pick up replaced files
+MANIFEST_CHECK_INTERVAL = 5.0
+
+_manifest: Optional[AssetManifest] = None
+_manifest_checked = 0.0
+_manifest_lock = threading.Lock()
+
+def build_manifest(base_dir: Optional[Path] = None) -> AssetManifest:
+    """Stat, hash and probe every asset once."""
+    base_dir = Path(base_dir or Path.cwd()).resolve()
+    manifest = AssetManifest(base_dir=str(base_dir))
+    
+    for name, (relative_path, required) in ASSET_SPECS.items():
+        manifest.assets[name] = _describe_asset(base_dir, relative_path, required)
+    
+    return manifest
+
+def load_manifest(manifest_path: str = MANIFEST_PATH, base_dir: Optional[Path] = None) -> AssetManifest:
+    """Load the manifest from disk, rebuilding and saving it if any asset changed."""
+    base_dir = Path(base_dir or Path.cwd()).resolve()
+    
+    try:
+        manifest = AssetManifest.model_validate_json(Path(manifest_path).read_text(encoding='utf-8'))
+        if manifest.base_dir == str(base_dir) and set(manifest.assets) == set(ASSET_SPECS) and _is_current(manifest):
+            return manifest
+        logger.info("Asset manifest is stale, rebuilding")
+    except (OSError, ValueError):
+        logger.info("Asset manifest not found, building")
+    
+    manifest = build_manifest(base_dir)
+    save_manifest(manifest, manifest_path)
+    return manifest
+
+def save_manifest(manifest: AssetManifest, manifest_path: str = MANIFEST_PATH):
+    try:
+        temp_path = Path(manifest_path).with_suffix('.tmp')
+        temp_path.write_text(manifest.model_dump_json(indent=2), encoding='utf-8')
+        os.replace(temp_path, manifest_path)
+    except OSError as e:
+        logger.warning(f"Could not write asset manifest: {e}")
+
+def get_manifest() -> AssetManifest:
+    """Return the process-wide manifest, loading it on first use.
+    
+    At most every MANIFEST_CHECK_INTERVAL seconds the assets are re-statted
+    (size and mtime) and the manifest is rebuilt if any changed, so content
+    hashes, and the caches keyed by them, follow replaced files.
+    """
+    global _manifest, _manifest_checked
+    
+    with _manifest_lock:
+        now = time.monotonic()
+        if _manifest is None:
+            _manifest = load_manifest()
+            _manifest_checked = now
+        elif now - _manifest_checked >= MANIFEST_CHECK_INTERVAL:
+            if not _is_current(_manifest):
+                logger.info("Assets changed on disk, reloading manifest")
+                _manifest = load_manifest()
+            _manifest_checked = now
+        return _manifest
+
+def _is_current(manifest: AssetManifest) -> bool:
+    """Check size and mtime of every asset against the manifest (one stat each)."""
+    for name, asset in manifest.assets.items():
+        path = Path(manifest.base_dir) / asset.path
+        try:
+            stat = path.stat()
+        except OSError:
+            if asset.exists:
+                return False
+            continue
+        
+        if not asset.exists or stat.st_size != asset.size or stat.st_mtime != asset.mtime:
+            return False
+    return True
+
+def _describe_asset(base_dir: Path, relative_path: str, required: bool) -> AssetInfo:
+    path = base_dir / relative_path
+    asset = AssetInfo(path=relative_path, required=required)
+    
+    if not path.is_file():
+        return asset
+    
+    stat = path.stat()
+    asset.exists = True
+    asset.size = stat.st_size
+    asset.mtime = stat.st_mtime
+    asset.sha256 = _hash_file(path)
+    
+    if path.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp"):
+        try:
+            with Image.open(path) as image:
+                asset.width, asset.height = image.size
+        except Exception as e:
+            logger.warning(f"Could not read image size of {path}: {e}")
+    elif path.suffix.lower() in (".mp3", ".wav", ".m4a", ".aac"):
+        try:
+            asset.duration = float(ffmpeg.probe(str(path))['format']['duration'])
+        except Exception as e:
+            logger.warning(f"Could not probe audio duration of {path}: {e}")
+    
+    return asset
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def main() -> int:
+    """Build the manifest (e.g. at image build time) and report missing assets."""
+    manifest = build_manifest()
+    save_manifest(manifest)
+    
+    for name, asset in manifest.assets.items():
+        status = "✅" if asset.exists else ("❌" if asset.required else "⚠️")
+        print(f"{status} {name}: {asset.path}")
+    
+    missing = manifest.missing()
+    if missing:
+        print(f"Missing required assets: {', '.join(missing)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import os
+import sys
+import json
+import mmap
+import bisect
+import random
+import logging
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+from PIL import Image
+
+from .assets import _hash_file
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = "data/backgrounds/library"
+STORE_DIR = "data/background_store"
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+# Backgrounds are opaque, so frames are stored as raw RGB (3 bytes per pixel,
+# about 6 MB per 1080x1920 frame); the renderer converts once when compositing
+FRAME_MODE = "RGB"
+BYTES_PER_PIXEL = 3
+
+
+class LibraryFrame(NamedTuple):
+    name: str
+    source_path: str
+    image: Image.Image
+
+
+_library: Optional["BackgroundLibrary"] = None
+_library_loaded = False
+_library_lock = threading.Lock()
+
+
+class BackgroundLibrary:
+    """Pre-scaled background frames in a single memory-mapped file.
+
+    build() resizes every image in the source directory once to the slide
+    size and writes the raw pixels to frames.bin, with offsets, content
+    hashes and selection weights in index.json. Serving a frame is a single
+    copy out of the page cache, with no decoding or resizing.
+    """
+
+    def __init__(self, store_dir: str = STORE_DIR, width: int = 1080, height: int = 1920):
+        self.store_dir = Path(store_dir)
+        self.width = width
+        self.height = height
+        self.frame_size = width * height * BYTES_PER_PIXEL
+        self.entries: List[dict] = []
+        # Source images are recorded relative to this directory, so a store
+        # built on one host stays valid where the library is mounted elsewhere
+        self.source_dir = SOURCE_DIR
+        self._cumulative_weights: List[float] = []
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> Path:
+        return self.store_dir / "index.json"
+
+    @property
+    def frames_path(self) -> Path:
+        return self.store_dir / "frames.bin"
+
+    @classmethod
+    def open(cls, store_dir: str = STORE_DIR, width: int = 1080, height: int = 1920) -> Optional["BackgroundLibrary"]:
+        """Open an existing store, or return None if there is no usable one."""
+        library = cls(store_dir, width, height)
+        try:
+            library._load_index()
+        except (OSError, ValueError) as e:
+            logger.info(f"Background library not available: {e}")
+            return None
+        return library if library.entries else None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def frame(self, index: int) -> LibraryFrame:
+        """Return a frame read straight from the mapped store."""
+        entry = self.entries[index]
+        # Decode straight from the mapping; the view is released so close() still works
+        with memoryview(self._mapping()) as view:
+            image = Image.frombytes(FRAME_MODE, (self.width, self.height), view[entry['offset']:entry['offset'] + self.frame_size])
+        return LibraryFrame(entry['name'], os.path.join(self.source_dir, entry['name']), image)
+
+    def choose(self, rng: Optional[random.Random] = None) -> LibraryFrame:
+        """Pick a frame at random, proportionally to its weight."""
+        rng = rng or random
+        point = rng.random() * self._cumulative_weights[-1]
+        index = bisect.bisect_right(self._cumulative_weights, point)
+        return self.frame(min(index, len(self.entries) - 1))
+
+    def build(self, source_dir: str = SOURCE_DIR) -> int:
+        """Scale every source image into a new store. Returns the number of frames.
+
+        Unchanged images (same content hash) are copied from the previous
+        store instead of being decoded and resized again. Optional weights are
+        read from weights.json in the source directory ({"file.jpg": 2.0}).
+        """
+        source = Path(source_dir)
+        weights = self._load_weights(source)
+        previous = self._previous_offsets()
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        temp_frames = self.frames_path.with_suffix('.tmp')
+        entries = []
+
+        with open(temp_frames, 'wb') as frames:
+            for path in sorted(source.iterdir()) if source.is_dir() else []:
+                if path.suffix.lower() not in IMAGE_SUFFIXES:
+                    continue
+
+                sha256 = _hash_file(path)
+                if sha256 in previous:
+                    offset = previous[sha256]
+                    pixels = self._mapping()[offset:offset + self.frame_size]
+                else:
+                    try:
+                        pixels = self._scale(path)
+                    except Exception as e:
+                        logger.warning(f"Skipping background {path}: {e}")
+                        continue
+
+                entries.append({
+                    'name': path.name,
+                    'sha256': sha256,
+                    'offset': frames.tell(),
+                    'weight': float(weights.get(path.name, 1.0))
+                })
+                frames.write(pixels)
+
+        self.close()
+        os.replace(temp_frames, self.frames_path)
+        self.source_dir = source_dir
+        self._write_index(entries)
+        self._load_index()
+
+        logger.info(f"Background library built with {len(entries)} frames")
+        return len(entries)
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+    def _mapping(self) -> mmap.mmap:
+        with self._lock:
+            if self._mmap is None:
+                with open(self.frames_path, 'rb') as frames:
+                    self._mmap = mmap.mmap(frames.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _scale(self, path: Path) -> bytes:
+        with Image.open(path) as image:
+            scaled = image.convert(FRAME_MODE).resize((self.width, self.height), Image.Resampling.LANCZOS)
+        return scaled.tobytes()
+
+    def _previous_offsets(self) -> dict:
+        """Map content hashes of the current store to their frame offsets."""
+        try:
+            self._load_index()
+        except (OSError, ValueError):
+            return {}
+        return {entry['sha256']: entry['offset'] for entry in self.entries}
+
+    def _load_index(self):
+        index = json.loads(self.index_path.read_text(encoding='utf-8'))
+        if (index['width'], index['height']) != (self.width, self.height):
+            raise ValueError(f"store holds {index['width']}x{index['height']} frames, expected {self.width}x{self.height}")
+
+        if index.get('mode') != FRAME_MODE:
+            raise ValueError(f"store holds {index.get('mode')} frames, expected {FRAME_MODE}; rebuild it")
+
+        expected_size = len(index['frames']) * self.frame_size
+        if self.frames_path.stat().st_size != expected_size:
+            raise ValueError("frame store size does not match its index")
+
+        self.source_dir = index.get('source_dir', SOURCE_DIR)
+        self.entries = index['frames']
+        self._cumulative_weights = []
+        total = 0.0
+        for entry in self.entries:
+            total += max(entry['weight'], 0.0)
+            self._cumulative_weights.append(total)
+        if self.entries and total <= 0:
+            raise ValueError("all background weights are zero")
+
+    def _write_index(self, entries: List[dict]):
+        index = {
+            'width': self.width,
+            'height': self.height,
+            'mode': FRAME_MODE,
+            'source_dir': self.source_dir,
+            'frames': entries
+        }
+        temp_path = self.index_path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(index, indent=2), encoding='utf-8')
+        os.replace(temp_path, self.index_path)
+
+    @staticmethod
+    def _load_weights(source: Path) -> dict:
+        try:
+            return json.loads((source / "weights.json").read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+
+def get_background_library() -> Optional[BackgroundLibrary]:
+    """Return the process-wide library, opening it on first use; None without a built store."""
+    global _library, _library_loaded
+
+    with _library_lock:
+        if not _library_loaded:
+            _library = BackgroundLibrary.open()
+            _library_loaded = True
+        return _library
+
+
+def main() -> int:
+    """Build the store from data/backgrounds/library at the default slide size."""
+    source_dir = sys.argv[1] if len(sys.argv) > 1 else SOURCE_DIR
+    count = BackgroundLibrary().build(source_dir)
+    print(f"✅ Background library: {count} frames in {STORE_DIR}")
+    return 0 if count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
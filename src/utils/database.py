@@ -1,5 +1,6 @@
 import sqlite3
 import csv
+import json
 import random
 from typing import List, Optional
 from pathlib import Path
@@ -24,6 +25,29 @@ class QuoteDatabase:
                     status TEXT DEFAULT 'unused'
                 )
             """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    quote_id INTEGER NOT NULL REFERENCES quotes(id),
+                    file_path TEXT NOT NULL,
+                    thumbnails TEXT NOT NULL DEFAULT '[]',
+                    generation_time REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scheduler_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    day TEXT NOT NULL,
+                    quota INTEGER NOT NULL,
+                    videos INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    busy_seconds REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    finished_at TEXT
+                )
+            """)
             conn.commit()
     
     def upload_csv(self, csv_file_path: str) -> int:
@@ -80,9 +104,9 @@ class QuoteDatabase:
             """)
             unused_quotes = cursor.fetchall()
             
-            # If no unused quotes, reset all to unused
+            # If no unused quotes, reset used ones (claimed quotes stay claimed)
             if not unused_quotes:
-                conn.execute("UPDATE quotes SET status = 'unused'")
+                conn.execute("UPDATE quotes SET status = 'unused' WHERE status = 'used'")
                 conn.commit()
                 
                 cursor = conn.execute("SELECT * FROM quotes WHERE status = 'unused'")
@@ -102,12 +126,96 @@ class QuoteDatabase:
                 status=QuoteStatus.UNUSED
             )
     
+    def claim_random_unused_quote(self, reset_when_empty: bool = False) -> Optional[Quote]:
+        """Pick a random unused quote and mark it in progress in one transaction.
+        
+        Concurrent generations never get the same quote. Without
+        `reset_when_empty` this returns None once no unused quotes are left;
+        with it, used quotes are recycled as in get_random_unused_quote.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            # Take the write lock up front so the pick and the claim cannot interleave
+            conn.execute("BEGIN IMMEDIATE")
+            
+            row = conn.execute("SELECT * FROM quotes WHERE status = 'unused' ORDER BY RANDOM() LIMIT 1").fetchone()
+            if row is None and reset_when_empty:
+                conn.execute("UPDATE quotes SET status = 'unused' WHERE status = 'used'")
+                row = conn.execute("SELECT * FROM quotes WHERE status = 'unused' ORDER BY RANDOM() LIMIT 1").fetchone()
+            if row is None:
+                return None
+            
+            conn.execute("UPDATE quotes SET status = 'in_progress' WHERE id = ? AND status = 'unused'", (row['id'],))
+            conn.commit()
+            
+            return Quote(
+                id=row['id'],
+                quote=row['quote'],
+                author=row['author'],
+                reflection=row['reflection'],
+                social_media_post=row['social_media_post'],
+                status=QuoteStatus.IN_PROGRESS
+            )
+    
+    def release_quote(self, quote_id: int):
+        """Return a claimed quote to the pool after a failed generation."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE quotes SET status = 'unused' WHERE id = ? AND status = 'in_progress'", (quote_id,))
+            conn.commit()
+    
+    def release_claimed_quotes(self) -> int:
+        """Release claims left by a previous process. Returns the number released."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("UPDATE quotes SET status = 'unused' WHERE status = 'in_progress'")
+            conn.commit()
+            return cursor.rowcount
+    
     def mark_quote_used(self, quote_id: int):
         """Mark a quote as used."""
         with sqlite3.connect(self.db_path) as conn:
             conn.execute("UPDATE quotes SET status = 'used' WHERE id = ?", (quote_id,))
             conn.commit()
     
+    def add_video(self, quote_id: int, file_path: str, thumbnails: Optional[List[str]] = None,
+                  generation_time: Optional[float] = None) -> int:
+        """Record a generated video. Returns the video id."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("""
+                INSERT INTO videos (quote_id, file_path, thumbnails, generation_time)
+                VALUES (?, ?, ?, ?)
+            """, (quote_id, file_path, json.dumps(thumbnails or []), generation_time))
+            conn.commit()
+            return cursor.lastrowid
+    
+    def get_videos(self, video_ids: Optional[List[int]] = None, limit: Optional[int] = None) -> List[dict]:
+        """Get generated videos with their quotes, newest first."""
+        query = """
+            SELECT videos.id, videos.quote_id, videos.file_path, videos.thumbnails,
+                   videos.generation_time, videos.created_at,
+                   quotes.quote, quotes.author, quotes.social_media_post
+            FROM videos JOIN quotes ON quotes.id = videos.quote_id
+        """
+        params: list = []
+        
+        if video_ids is not None:
+            query += f" WHERE videos.id IN ({', '.join('?' for _ in video_ids)})"
+            params.extend(video_ids)
+        query += " ORDER BY videos.id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(query, params).fetchall()
+        
+        videos = []
+        for row in rows:
+            video = dict(row)
+            video['thumbnails'] = json.loads(video['thumbnails'])
+            videos.append(video)
+        return videos
+    
     def get_stats(self) -> dict:
         """Get database statistics."""
         with sqlite3.connect(self.db_path) as conn:
@@ -120,5 +228,53 @@ class QuoteDatabase:
             return {
                 'total': total,
                 'unused': stats.get('unused', 0),
-                'used': stats.get('used', 0)
-            }
\ No newline at end of file
+                'used': stats.get('used', 0),
+                'in_progress': stats.get('in_progress', 0)
+            }
+    
+    def start_scheduler_run(self, day: str, quota: int) -> int:
+        """Record the start of a batch generation run. Returns the run id."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("INSERT INTO scheduler_runs (day, quota) VALUES (?, ?)", (day, quota))
+            conn.commit()
+            return cursor.lastrowid
+    
+    def update_scheduler_run(self, run_id: int, videos: int, failures: int, busy_seconds: float,
+                             status: Optional[str] = None):
+        """Store a run's progress; a status other than 'running' also marks it finished."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE scheduler_runs
+                SET videos = ?, failures = ?, busy_seconds = ?, status = COALESCE(?, status),
+                    finished_at = CASE WHEN ? IS NULL THEN finished_at ELSE CURRENT_TIMESTAMP END
+                WHERE id = ?
+            """, (videos, failures, busy_seconds, status, status, run_id))
+            conn.commit()
+    
+    def close_interrupted_runs(self):
+        """Mark runs left 'running' by a previous process as interrupted."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE scheduler_runs SET status = 'interrupted', finished_at = CURRENT_TIMESTAMP
+                WHERE status = 'running'
+            """)
+            conn.commit()
+    
+    def get_scheduled_video_count(self, day: str) -> int:
+        """Number of videos the scheduler generated on the given day (YYYY-MM-DD)."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute("SELECT COALESCE(SUM(videos), 0) FROM scheduler_runs WHERE day = ?", (day,))
+            return cursor.fetchone()[0]
+    
+    def get_scheduler_runs(self, limit: int = 20) -> List[dict]:
+        """Get recent batch runs with their throughput in videos per hour, newest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM scheduler_runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        
+        runs = []
+        for row in rows:
+            run = dict(row)
+            run['videos_per_hour'] = 3600 * run['videos'] / run['busy_seconds'] if run['busy_seconds'] else 0.0
+            runs.append(run)
+        return runs
@@ -0,0 +1,86 @@
+import io
+import json
+import zipfile
+import logging
+from pathlib import Path
+from typing import Iterator, List
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable write target that hands written bytes over in chunks.
+    
+    zipfile detects that it cannot seek and writes sizes and CRCs in data
+    descriptors after each entry, so nothing has to be rewritten later.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+def stream_export(videos: List[dict]) -> Iterator[bytes]:
+    """Stream a ZIP of videos, their social media posts and a manifest.
+    
+    Bytes are yielded as soon as they are produced, so memory use stays at
+    about one read chunk no matter how many videos are exported. MP4s are
+    stored uncompressed since they are already compressed.
+    """
+    sink = _ZipSink()
+    manifest = []
+    
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for video in videos:
+            video_path = Path(video['file_path'])
+            entry = {
+                'id': video['id'],
+                'quote_id': video['quote_id'],
+                'quote': video['quote'],
+                'author': video['author'],
+                'created_at': video['created_at'],
+                'video': None,
+                'post': None
+            }
+            
+            if video_path.is_file():
+                entry['video'] = f"videos/{video_path.name}"
+                info = zipfile.ZipInfo.from_file(video_path, entry['video'])
+                info.compress_type = zipfile.ZIP_STORED
+                
+                with open(video_path, 'rb') as source, \
+                        archive.open(info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as target:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                        target.write(chunk)
+                        yield from _flush(sink)
+            else:
+                logger.warning(f"Export skipped missing video file: {video_path}")
+            
+            if video['social_media_post']:
+                entry['post'] = f"posts/{video_path.stem}.txt"
+                archive.writestr(entry['post'], video['social_media_post'])
+            
+            manifest.append(entry)
+            yield from _flush(sink)
+        
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    
+    # Closing the archive writes the central directory
+    yield from _flush(sink)
+
+def _flush(sink: _ZipSink) -> Iterator[bytes]:
+    data = sink.drain()
+    if data:
+        yield data
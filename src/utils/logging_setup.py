@@ -0,0 +1,132 @@
+import json
+import uuid
+import zlib
+import queue
+import atexit
+import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Iterator, Optional
+
+# Id of the video job the current code runs for, attached to every log record
+_job_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("job_id", default=None)
+
+_listener: Optional[QueueListener] = None
+
+# Debug sampling only applies to the application's own loggers
+APP_LOGGER = "src"
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@contextmanager
+def job_context(job_id: Optional[str] = None) -> Iterator[str]:
+    """Tag all log records emitted inside the block with a job id."""
+    job_id = job_id or new_job_id()
+    token = _job_id.set(job_id)
+    try:
+        yield job_id
+    finally:
+        _job_id.reset(token)
+
+
+class JobContextFilter(logging.Filter):
+    """Attach the current job id to records and sample per-job debug lines.
+
+    Sampling is decided per job, not per record, so a sampled job keeps its
+    complete debug trace while the others contribute only INFO and above.
+    """
+
+    def __init__(self, level: int = logging.INFO, debug_sample_rate: float = 0.0):
+        super().__init__()
+        self.level = level
+        self.debug_threshold = int(max(0.0, min(1.0, debug_sample_rate)) * 10000)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        job_id = _job_id.get()
+        record.job_id = job_id or "-"
+
+        if record.levelno >= self.level:
+            return True
+        # Below the configured level only the traces of sampled jobs get through
+        return job_id is not None and zlib.crc32(job_id.encode()) % 10000 < self.debug_threshold
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'job_id': getattr(record, 'job_id', "-"),
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LocalQueueHandler(QueueHandler):
+    """Enqueue records as they are, leaving all formatting to the listener thread.
+
+    The stock prepare() formats on the calling thread and drops exc_info to
+    make records picklable, which an in-process queue does not need.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(log_path: str = "app.log", level: int = logging.INFO,
+                  max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                  debug_sample_rate: float = 0.0):
+    """Route all logging through a queue drained by a background listener thread.
+
+    Callers only enqueue records; formatting and file/console I/O happen on
+    the listener thread. The file log is JSON lines with size-based rotation.
+    Set `debug_sample_rate` above zero to keep full debug traces of the
+    application's loggers for that fraction of jobs; third-party libraries
+    stay at `level`.
+    """
+    global _listener
+
+    if _listener is not None:
+        return
+
+    file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - [%(job_id)s] %(message)s'
+    ))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LocalQueueHandler(log_queue)
+    queue_handler.addFilter(JobContextFilter(level, debug_sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    logging.getLogger(APP_LOGGER).setLevel(logging.DEBUG if debug_sample_rate > 0 else logging.NOTSET)
+
+    _listener = QueueListener(log_queue, file_handler, console_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,244 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .database import QuoteDatabase
+from .logging_setup import job_context
+
+logger = logging.getLogger(__name__)
+
+# Off-peak window as (start, end) local times; end before start wraps past midnight
+Window = Tuple[dt_time, dt_time]
+
+
+def parse_windows(spec: str) -> List[Window]:
+    """Parse windows like "01:00-06:00,22:30-23:59"."""
+    windows = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        try:
+            start, end = (dt_time.fromisoformat(value.strip()) for value in part.split("-"))
+        except ValueError:
+            raise ValueError(f"Invalid scheduler window: {part.strip()} (expected HH:MM-HH:MM)")
+        windows.append((start, end))
+    return windows
+
+
+def in_windows(windows: List[Window], now: datetime) -> bool:
+    """Check whether the local time of `now` falls inside any window."""
+    current = now.time()
+    for start, end in windows:
+        if start <= end:
+            if start <= current < end:
+                return True
+        elif current >= start or current < end:
+            return True
+    return False
+
+
+class BatchScheduler:
+    """Generates a daily quota of videos in off-peak windows, one video per time slice.
+
+    `job(threads)` generates a single video with at most that many threads and
+    returns False once there is nothing left to generate; `is_off_peak(now)`
+    decides when batch work may run. Both are supplied by the caller.
+
+    Batch work runs at niceness `nice`, so a video that is already encoding
+    when an interactive request arrives immediately gets only the CPU time the
+    interactive one leaves over. The thread budget itself is only applied at
+    video boundaries: a running video keeps the threads it started with.
+    Between videos the scheduler re-checks the window, the quota and
+    interactive load: no batch video starts while an interactive request is
+    running, and for `cooldown` seconds after one the next videos get only
+    `min_budget` threads.
+
+    A failed video is retried after an exponentially growing pause (starting
+    at `poll_interval`, capped at `max_backoff`); after `max_failures` failures
+    in a row the run ends as "failing" and no batch video starts until the
+    next day. Progress and per-run throughput are stored in the
+    scheduler_runs table, so after a restart today's quota resumes where it
+    stopped.
+    """
+
+    def __init__(self, job: Callable[[int], bool], db: QuoteDatabase, daily_quota: int,
+                 is_off_peak: Callable[[datetime], bool], cpu_budget: Optional[int] = None,
+                 min_budget: int = 1, cooldown: float = 300.0, poll_interval: float = 30.0,
+                 nice: int = 19, max_failures: int = 5, max_backoff: float = 3600.0):
+        if daily_quota < 1:
+            raise ValueError("The daily quota must be at least 1")
+
+        self.job = job
+        self.db = db
+        self.daily_quota = daily_quota
+        self.is_off_peak = is_off_peak
+        self.cpu_budget = max(cpu_budget or os.cpu_count() or 1, min_budget)
+        self.min_budget = min_budget
+        self.cooldown = cooldown
+        self.poll_interval = poll_interval
+        self.nice = nice
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+
+        self._active_interactive = 0
+        self._last_interactive = float("-inf")
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.db.close_interrupted_runs()
+        self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Batch scheduler started: {self.daily_quota} videos/day, up to {self.cpu_budget} threads")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop after the current video; its run is recorded as stopped."""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def begin_interactive(self):
+        with self._condition:
+            self._active_interactive += 1
+
+    def end_interactive(self):
+        with self._condition:
+            self._active_interactive -= 1
+            self._last_interactive = time.monotonic()
+            self._condition.notify_all()
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Mark an interactive request; batch work yields to it."""
+        self.begin_interactive()
+        try:
+            yield
+        finally:
+            self.end_interactive()
+
+    def current_budget(self) -> int:
+        """Threads a batch video may use right now (0 while interactive requests run)."""
+        with self._condition:
+            return self._budget()
+
+    def _budget(self) -> int:
+        if self._active_interactive:
+            return 0
+        if time.monotonic() - self._last_interactive < self.cooldown:
+            return self.min_budget
+        return self.cpu_budget
+
+    def _wait_for_budget(self) -> Optional[int]:
+        """Block while interactive requests run; None if the scheduler was stopped."""
+        with self._condition:
+            while self._active_interactive and not self._stop.is_set():
+                self._condition.wait(self.poll_interval)
+            return None if self._stop.is_set() else self._budget()
+
+    def _lower_priority(self):
+        """Renice the scheduler thread.
+
+        On Linux niceness is per thread and inherited by the threads and
+        processes it creates, so render pools and FFmpeg of batch videos all
+        run at this priority while the rest of the app is unaffected.
+        """
+        if not self.nice or not hasattr(os, "setpriority"):
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except OSError as e:
+            logger.warning(f"Could not lower batch priority: {e}")
+
+    def _run(self):
+        self._lower_priority()
+        run = None
+        consecutive_failures = 0
+        failing_day = None
+
+        while not self._stop.is_set():
+            now = datetime.now()
+            day = now.date().isoformat()
+
+            if run and run['day'] != day:
+                self._finish_run(run, "day_ended")
+                run = None
+
+            remaining = self.daily_quota - self.db.get_scheduled_video_count(day)
+            idle_status = None
+            if remaining <= 0:
+                idle_status = "completed"
+            elif day == failing_day:
+                idle_status = "failing"
+            elif not self.is_off_peak(now):
+                idle_status = "window_closed"
+            elif self.db.get_stats()['unused'] == 0:
+                idle_status = "no_quotes"
+
+            if idle_status:
+                if run:
+                    self._finish_run(run, idle_status)
+                    run = None
+                self._stop.wait(self.poll_interval)
+                continue
+
+            threads = self._wait_for_budget()
+            if threads is None:
+                break
+
+            if run is None:
+                run = {'id': self.db.start_scheduler_run(day, self.daily_quota), 'day': day,
+                       'videos': 0, 'failures': 0, 'busy_seconds': 0.0}
+                logger.info(f"Batch run started: {remaining} of {self.daily_quota} videos left for {day}")
+
+            produced, failed, seconds = self._generate(threads)
+            run['videos'] += produced
+            run['failures'] += failed
+            run['busy_seconds'] += seconds
+            self.db.update_scheduler_run(run['id'], run['videos'], run['failures'], run['busy_seconds'])
+
+            if failed:
+                consecutive_failures += 1
+                if consecutive_failures >= self.max_failures:
+                    logger.error(f"Batch run failing: {consecutive_failures} videos failed in a row, pausing until tomorrow")
+                    self._finish_run(run, "failing")
+                    run = None
+                    failing_day = day
+                    consecutive_failures = 0
+                    continue
+                backoff = min(self.poll_interval * 2 ** (consecutive_failures - 1), self.max_backoff)
+                logger.info(f"Retrying batch video in {backoff:.0f}s")
+                self._stop.wait(backoff)
+            elif produced:
+                consecutive_failures = 0
+            else:
+                logger.info("Batch run has no unused quotes left")
+                self._finish_run(run, "no_quotes")
+                run = None
+                self._stop.wait(self.poll_interval)
+
+        if run:
+            self._finish_run(run, "stopped")
+
+    def _generate(self, threads: int) -> Tuple[bool, bool, float]:
+        """Run the job once; returns (produced a video, failed, seconds taken)."""
+        start = time.monotonic()
+        try:
+            with job_context():
+                logger.debug(f"Batch video with {threads} thread(s)")
+                produced, failed = bool(self.job(threads)), False
+        except Exception as e:
+            logger.error(f"Batch video failed: {e}")
+            produced, failed = False, True
+        return produced, failed, time.monotonic() - start
+
+    def _finish_run(self, run: dict, status: str):
+        self.db.update_scheduler_run(run['id'], run['videos'], run['failures'], run['busy_seconds'], status)
+        rate = 3600 * run['videos'] / run['busy_seconds'] if run['busy_seconds'] else 0.0
+        logger.info(f"Batch run {status}: {run['videos']} videos, {run['failures']} failures, {rate:.1f} videos/hour")
@@ -4,6 +4,8 @@
 import os
 from pathlib import Path
 
+from src.utils.assets import build_manifest, save_manifest
+
 def check_file(path, description):
     """Check if a file exists and is readable."""
     exists = os.path.exists(path)
@@ -28,20 +30,21 @@ def main():
     
     all_good = True
     
-    # Check backgrounds
-    print("📁 Backgrounds:")
-    all_good &= check_file("data/backgrounds/background_1.jpg", "Background 1")
-    all_good &= check_file("data/backgrounds/background_2.jpg", "Background 2")
-    print()
-    
-    # Check audio
-    print("📁 Audio:")
-    all_good &= check_file("data/audio/background-music-1.mp3", "Background Music")
-    print()
-    
-    # Check fonts
-    print("📁 Fonts:")
-    all_good &= check_file("data/fonts/RobotoSerif-Regular.ttf", "Roboto Serif Font")
+    # Check assets from the manifest the generator uses
+    print("📁 Assets:")
+    manifest = build_manifest()
+    save_manifest(manifest)
+    for name, asset in manifest.assets.items():
+        if asset.exists:
+            details = f"{asset.size:,} bytes, sha256 {asset.sha256[:12]}"
+            if asset.width:
+                details += f", {asset.width}x{asset.height}"
+            if asset.duration:
+                details += f", {asset.duration:.1f}s"
+            print(f"✅ {name}: {asset.path} ({details})")
+        else:
+            print(f"{'❌' if asset.required else '⚠️'} {name}: {asset.path} - File not found{'' if asset.required else ' (optional)'}")
+    all_good &= not manifest.missing()
     print()
     
     # Check database